@@ -19,6 +19,8 @@ class Application(QStackedWidget):
 
         # home Page
         self.home_page = None
+        self.lifecycle = PageLifecycle(self, lambda user: HomePage(
+            self, HomeView(), HomeModel(), user))
 
         # start page
         self.addWidget(self.login_page.view)
@@ -28,13 +30,7 @@ class Application(QStackedWidget):
         if self.current_user is None:
             return
 
-        self.home_page = HomePage(
-            self, HomeView(), HomeModel(), self.current_user)
-
-        self.order_page = OrderPage(OrderView(), OrderModel())
-
-        # replace widget if already exist
-        self.insertWidget(1, self.home_page.view)
+        self.home_page = self.lifecycle.open(self.current_user)
         self.move_to_home()
 
     def set_current_user(self, user: User) -> None:
@@ -42,11 +38,12 @@ class Application(QStackedWidget):
 
     def move_to_login(self):
         self.current_user = None
+        AppDAO.release()
         self.login_page.clear_input_field()
         self.setCurrentIndex(0)
 
     def move_to_home(self):
-        self.setCurrentIndex(1)
+        self.setCurrentWidget(self.home_page.view)
 
     def start(self) -> None:
         "driver method."
@@ -0,0 +1,146 @@
+import os
+from PySide6.QtCore import QDir, QFile, QIODevice, QRectF, QResource, QSize, Qt
+from PySide6.QtGui import QFontDatabase, QGuiApplication, QPainter, QPixmap, QPixmapCache
+
+try:
+    from PySide6.QtSvg import QSvgRenderer
+except ImportError:  # QtSvg is an optional Qt module, fall back to the PNG copies
+    QSvgRenderer = None
+
+
+class Assets:
+    """
+    every image the application shows, resolved relative to the package.\n
+    pixmaps are decoded once and kept in QPixmapCache, SVGs are rasterized once
+    per size and device pixel ratio. QPixmap is implicitly shared, so every
+    screen gets the same instance instead of decoding its own.\n
+    when the packed bundle (see build_assets.py) is present everything is served
+    from it, otherwise from the loose files in the source tree.
+    """
+    __PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+    __ROOT_DIR = os.path.join(__PACKAGE_DIR, "asset")
+    IMAGE_DIR = "Image"
+    SVG_DIR = "svgs"
+    FONT_DIR = "fonts"
+
+    # theme.qss refers to images as url(asset:Image/<name>.png)
+    SEARCH_PREFIX = "asset"
+    CACHE_LIMIT_KB = 64 * 1024
+
+    # NAAR_RAAN_ASSETS=loose ignores the bundle, any other value is the bundle to use
+    BUNDLE_PATH = os.path.join(__PACKAGE_DIR, "assets.rcc")
+    __bundle: str = None
+
+    @staticmethod
+    def load_bundle() -> bool:
+        "memory-map the bundle if there is one, return True if assets now come from it."
+        if Assets.__bundle is not None:
+            return True
+
+        path = os.environ.get("NAAR_RAAN_ASSETS", Assets.BUNDLE_PATH)
+        if path == "loose" or not os.path.isfile(path):
+            return False
+        if not QResource.registerResource(path):
+            return False
+        Assets.__bundle = path
+        return True
+
+    @staticmethod
+    def is_bundled() -> bool:
+        return Assets.__bundle is not None
+
+    @staticmethod
+    def read_bundled(name: str) -> bytes:
+        "return a file of the bundle, name is relative to the package, or None when not bundled."
+        if Assets.__bundle is None:
+            return None
+        file = QFile(":/" + name)
+        if not file.open(QIODevice.ReadOnly):
+            return None
+        data = file.readAll().data()
+        file.close()
+        return data
+
+    @staticmethod
+    def path(name: str) -> str:
+        "return where an asset is read from, name is relative to the asset folder."
+        if Assets.__bundle is not None:
+            return ":/asset/" + name
+        return os.path.join(Assets.__ROOT_DIR, name)
+
+    @staticmethod
+    def install() -> None:
+        """
+        load the bundle (when present), register the asset: search prefix, load the
+        bundled fonts and make room for every asset in QPixmapCache.
+        """
+        Assets.load_bundle()
+        QDir.setSearchPaths(Assets.SEARCH_PREFIX, [Assets.path("")])
+        QPixmapCache.setCacheLimit(
+            max(QPixmapCache.cacheLimit(), Assets.CACHE_LIMIT_KB))
+
+        font_dir = Assets.FONT_DIR
+        font_dir = ":/" + font_dir if Assets.is_bundled() else os.path.join(
+            Assets.__PACKAGE_DIR, font_dir)
+        for file_name in QDir(font_dir).entryList(QDir.Files, QDir.Name):
+            QFontDatabase.addApplicationFont(f"{font_dir}/{file_name}")
+
+    @staticmethod
+    def pixmap(name: str) -> QPixmap:
+        "return the shared pixmap of an image, e.g. pixmap(\"Image/logo.png\")."
+        key = f"{Assets.SEARCH_PREFIX}:{name}"
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None:
+            pixmap = QPixmap(Assets.path(name))
+            QPixmapCache.insert(key, pixmap)
+        return pixmap
+
+    @staticmethod
+    def svg(name: str, size: QSize = None, ratio: float = None) -> QPixmap:
+        """
+        return an SVG from the svgs folder rasterized for the screen.\n
+        size defaults to the SVG's own size, ratio to the primary screen's device pixel ratio.
+        """
+        if QSvgRenderer is None:
+            return Assets.pixmap(f"{Assets.IMAGE_DIR}/{os.path.splitext(name)[0]}.png")
+
+        ratio = ratio or Assets.__screen_ratio()
+        key = f"{Assets.SEARCH_PREFIX}:{Assets.SVG_DIR}/{name}"
+        if size is not None:
+            key += f"@{size.width()}x{size.height()}"
+        key += f"@{ratio}x"
+
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None:
+            pixmap = Assets.__rasterize(
+                Assets.path(f"{Assets.SVG_DIR}/{name}"), size, ratio)
+            QPixmapCache.insert(key, pixmap)
+        return pixmap
+
+    @staticmethod
+    def preload(ratio: float = None) -> int:
+        "decode every image and rasterize every SVG at its own size, return how many."
+        count = 0
+        for folder, load in [(Assets.IMAGE_DIR, Assets.pixmap),
+                             (Assets.SVG_DIR, lambda name: Assets.svg(os.path.basename(name), ratio=ratio))]:
+            for file_name in QDir(Assets.path(folder)).entryList(QDir.Files, QDir.Name):
+                load(f"{folder}/{file_name}")
+                count += 1
+        return count
+
+    @staticmethod
+    def __rasterize(path: str, size: QSize, ratio: float) -> QPixmap:
+        renderer = QSvgRenderer(path)
+        size = size or renderer.defaultSize()
+        pixmap = QPixmap(size * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        renderer.render(painter, QRectF(0, 0, size.width(), size.height()))
+        painter.end()
+        return pixmap
+
+    @staticmethod
+    def __screen_ratio() -> float:
+        screen = QGuiApplication.primaryScreen()
+        return 1.0 if screen is None else screen.devicePixelRatio()
@@ -0,0 +1,341 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+# never touch the shop database while benchmarking
+os.environ.setdefault("NAAR_RAAN_DB", os.path.join(
+    tempfile.mkdtemp(prefix="naar_raan_"), "benchmark.db"))
+
+from PySide6.QtWidgets import *
+from views import *
+from theme import Theme
+from data.orm.schema import Log, Receipt, OrderLine, User, Drink, Schema, Session, ENGINE_PROFILES, create_profile_engine
+from data.orm.data_access_object import AppDAO, ReceiptDAO, UserCache
+from executor import DAOExecutor
+from models import LoginService, OrderModel, SearchIndex
+from application import Application
+from controllers import DrinkDetail, OrderPage
+from build_assets import build_bundle
+from benchmark_tools import settle, summarize
+
+LOG_ROWS = 500
+LARGE_LOG_ROWS = 100000
+ORDER_COMMITS = 200
+LOGINS = 200
+LOGIN_CYCLES = 1000
+# live widgets the last login/logout cycle may have over the first
+WIDGET_TOLERANCE = 0
+TAPS = 500
+COLD_STARTS = 10
+CATALOG_SIZE = 10000
+SEARCHES = ["l", "la", "lat", "latte", "iced mo", "ชา", "ชาเย็น", "โกโก้ ice", "zzz"]
+FULL_TEXT_ROWS = 100000
+FULL_TEXT_SEARCHES = ["latte", "lat", "iced mocha", "cafe", "system", "zzz"]
+
+# run in a fresh interpreter: theme, every asset and the first two screens
+COLD_START_SCRIPT = """
+import time
+start = time.perf_counter()
+from PySide6.QtWidgets import QApplication
+app = QApplication([])
+from theme import Theme
+from assets import Assets
+from views import LoginView, HomeView
+Theme.apply(app)
+Assets.preload()
+for view in [LoginView(), HomeView()]:
+    view.show()
+    app.processEvents()
+print(Assets.is_bundled(), time.perf_counter() - start)
+"""
+
+
+def read_stylesheet() -> str:
+    "old behaviour: read theme.qss from disk on every call."
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "theme.qss"), "r") as file:
+        return file.read()
+
+
+def legacy_log_row(log: Log, per_widget_style: bool) -> QWidget:
+    "widget tree the log page used to build for every row."
+    row = QWidget()
+    row.setFixedSize(1680, 80)
+    row.setObjectName("brown_item")
+    for text, rect in zip(record_row(log), [QRect(0, 10, 211, 41), QRect(385, 10, 111, 41), QRect(630, 10, 1020, 41)]):
+        label = QLabel(text, row)
+        label.setObjectName("default_label")
+        label.setFont(Theme.DONGLE_REGULAR_65)
+        label.setGeometry(rect)
+    line = QFrame(row)
+    line.setObjectName("white_line")
+    line.setGeometry(QRect(0, 70, 1670, 3))
+    if per_widget_style:
+        row.setStyleSheet(read_stylesheet())
+    return row
+
+
+def make_logs(rows: int) -> list[Log]:
+    return [Log(f"log entry {i}", date="01-01-2022", time="12:00") for i in range(rows)]
+
+
+def show_and_close(view: QWidget) -> None:
+    view.show()
+    QApplication.processEvents()
+    view.close()
+    view.deleteLater()
+    QApplication.processEvents()
+
+
+def build_widget_log_page(logs: list[Log], per_widget_style: bool) -> float:
+    "build a scroll area with one widget per row and return the elapsed seconds."
+    start = time.perf_counter()
+    view = QScrollArea()
+    contents = QWidget()
+    vBox = QVBoxLayout(contents)
+    if per_widget_style:
+        view.setStyleSheet(read_stylesheet())
+    for log in logs:
+        vBox.addWidget(legacy_log_row(log, per_widget_style))
+    view.setWidget(contents)
+    show_and_close(view)
+    return time.perf_counter() - start
+
+
+def build_list_log_page(logs: list[Log]) -> float:
+    "build the log page on the list view and return the elapsed seconds."
+    start = time.perf_counter()
+    view = LogView()
+    view.set_items(logs)
+    show_and_close(view)
+    return time.perf_counter() - start
+
+
+def bench_stylesheet(app: QApplication) -> None:
+    logs = make_logs(LOG_ROWS)
+    app.setStyleSheet("")
+    before = build_widget_log_page(logs, per_widget_style=True)
+    Theme.apply(app)
+    after = build_widget_log_page(logs, per_widget_style=False)
+    print(f"log page ({LOG_ROWS} rows) per-widget stylesheet: {before * 1000:8.1f} ms")
+    print(f"log page ({LOG_ROWS} rows) application stylesheet: {after * 1000:8.1f} ms")
+
+
+def bench_list_view(app: QApplication) -> None:
+    Theme.apply(app)
+    for rows in [LOG_ROWS, LARGE_LOG_ROWS]:
+        elapsed = build_list_log_page(make_logs(rows))
+        print(f"log page ({rows} rows) list view: {elapsed * 1000:8.1f} ms")
+
+
+def bench_engine_profiles() -> None:
+    "order commit latency (receipt + 3 lines) under each engine profile."
+    for profile in ENGINE_PROFILES:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_profile_engine(
+                "sqlite:///" + os.path.join(directory, "bench.db"), profile)
+            Schema.metadata.create_all(engine)
+            session = Session(bind=engine)
+            receipt_dao = ReceiptDAO(session)
+
+            latencies = list()
+            for i in range(ORDER_COMMITS):
+                lines = [OrderLine("drink", 1, "Latte", "Hot 50", 1, 45.0)
+                         for _ in range(3)]
+                start = time.perf_counter()
+                receipt_dao.add_receipt_with_lines(
+                    Receipt("Income: 135.00"), lines)
+                latencies.append(time.perf_counter() - start)
+
+            session.close()
+            engine.dispose()
+
+        stats = summarize(latencies)
+        print(f"order commit ({profile:<8}) mean {stats['mean_ms']:6.2f} ms  p95 {stats['p95_ms']:6.2f} ms")
+
+
+def bench_login(app: QApplication) -> None:
+    "login latency as published by LoginService, with the user cache cold and warm."
+    AppDAO.get_dao("user").add_user(
+        User("Bench", "Mark", "bench", "bench", "staff"))
+
+    for label, cold in [("cold", True), ("warm", False)]:
+        latencies = list()
+        LoginService.add_latency_listener(latencies.append)
+        for i in range(LOGINS):
+            if cold:
+                UserCache.invalidate()
+            LoginService.login("bench", "bench", lambda user: None)
+            DAOExecutor.wait()
+            app.processEvents()
+        stats = summarize(latencies)
+        print(f"login ({label} cache) mean {stats['mean_ms']:6.2f} ms  p95 {stats['p95_ms']:6.2f} ms")
+        LoginService.remove_latency_listener(latencies.append)
+
+
+def bench_login_cycles(app: QApplication) -> bool:
+    "live QWidget count across login/logout cycles, return False when it grew."
+    admin = User("Bench", "Admin", "bench_admin", "bench", "admin")
+    staff = User("Bench", "Staff", "bench_staff", "bench", "staff")
+    user_dao = AppDAO.get_dao("user")
+    user_dao.add_users([admin, staff])
+    admin = user_dao.get_user_by_username("bench_admin")
+    staff = user_dao.get_user_by_username("bench_staff")
+    drink = Drink("Bench Latte", 40.0, 45.0, 50.0)
+    AppDAO.get_dao("drink").add_drink(drink)
+
+    root = Application()
+    counts = list()
+    start = time.perf_counter()
+    for i in range(LOGIN_CYCLES):
+        # same user twice in a row reuses the tree, a new user replaces it
+        root.set_current_user(admin if (i // 2) % 2 == 0 else staff)
+        root.initialize_page()
+        # open a product detail and cancel it
+        order_page = root.home_page.order_page
+        order_page.order_list.on_click(drink)
+        order_page.view.stacked_widget.currentWidget().cancel_button.click()
+        settle(app)
+        root.move_to_login()
+        settle(app)
+        counts.append(len(QApplication.allWidgets()))
+    elapsed = time.perf_counter() - start
+
+    print(f"login/logout x{LOGIN_CYCLES}: live widgets {counts[0]} -> {counts[-1]} "
+          f"(max {max(counts)})  {elapsed / LOGIN_CYCLES * 1000:6.2f} ms per cycle")
+    root.lifecycle.dispose()
+    root.deleteLater()
+    settle(app)
+    if counts[-1] > counts[0] + WIDGET_TOLERANCE:
+        print(f"FAIL: {counts[-1] - counts[0]} widgets leaked over {LOGIN_CYCLES} cycles",
+              file=sys.stderr)
+        return False
+    return True
+
+
+def bench_detail_pool(app: QApplication) -> None:
+    "tap-to-screen for a product detail, building the view every tap against the pool."
+    drink = Drink("Bench Mocha", 40.0, 45.0, 50.0)
+    order_page = OrderPage(OrderView(), OrderModel())
+    order_page.view.show()
+
+    for label, pooled in [("new view", False), ("pooled", True)]:
+        latencies = list()
+        for i in range(TAPS):
+            start = time.perf_counter()
+            view = order_page.drink_detail_pool.acquire() if pooled else DrinkDetailView()
+            detail = DrinkDetail(order_page, view, drink)
+            order_page.view.insert_view(detail.view, 1)
+            order_page.view.move_to_index(1)
+            app.processEvents()
+            latencies.append(time.perf_counter() - start)
+            if pooled:
+                detail.cancel_order()
+            else:
+                order_page.view.stacked_widget.removeWidget(view)
+                view.deleteLater()
+            settle(app)
+        stats = summarize(latencies)
+        print(f"drink detail tap ({label:<8}) mean {stats['mean_ms']:6.2f} ms  p95 {stats['p95_ms']:6.2f} ms")
+    order_page.dispose()
+    settle(app)
+
+
+def make_catalog(count: int) -> list[Drink]:
+    "count drinks with mixed Thai and English names."
+    english = ["Latte", "Mocha", "Americano", "Espresso", "Cappucino", "Matcha", "Cocoa", "Caramel"]
+    thai = ["ชาเย็น", "ชาเขียว", "โกโก้", "กาแฟ", "นมสด", "ชามะนาว"]
+    styles = ["Iced", "Hot", "Smoothie", "เย็น", "ปั่น"]
+    drinks = list()
+    for i in range(count):
+        name = f"{styles[i % len(styles)]} {english[i % len(english)]} {thai[i // 7 % len(thai)]} {i}"
+        drink = Drink(name, 40.0, 45.0, 50.0)
+        drink.id = i
+        drinks.append(drink)
+    return drinks
+
+
+def bench_search() -> None:
+    "as-you-type search over a 10k product catalog, and the cost of keeping it up to date."
+    drinks = make_catalog(CATALOG_SIZE)
+    start = time.perf_counter()
+    index = SearchIndex(lambda x: x.get_id(), lambda x: x.get_name())
+    for drink in drinks:
+        index.add(drink)
+    print(f"search index build ({CATALOG_SIZE} items): {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    for query in SEARCHES:
+        latencies = list()
+        for i in range(50):
+            start = time.perf_counter()
+            results = index.search(query)
+            latencies.append(time.perf_counter() - start)
+        print(f"search {query!r:<12} {len(results):6d} hits  median {summarize(latencies)['median_ms']:6.3f} ms")
+
+    start = time.perf_counter()
+    for drink in drinks[:100]:
+        index.remove(drink)
+        index.add(drink)
+    print(f"search index update: {(time.perf_counter() - start) * 10:6.3f} ms per edit")
+
+
+def bench_full_text() -> None:
+    "first page of log searches over the FTS5 index against a LIKE scan."
+    names = ["Latte", "Iced Mocha", "Americano", "Croissant", "Café Crème"]
+    dao = AppDAO.get_dao("log")
+    for i in range(FULL_TEXT_ROWS):
+        dao.add_log(Log(f"Add {names[i % len(names)]} {i} to system."))
+    dao.flush()
+
+    session = dao.session
+    for query in FULL_TEXT_SEARCHES:
+        start = time.perf_counter()
+        session.query(Log).filter(Log.desc.like(f"%{query}%")).order_by(
+            Log.id.desc()).limit(20).all()
+        scan = time.perf_counter() - start
+        timings = list()
+        for ranked in [True, False]:
+            start = time.perf_counter()
+            logs, cursor = dao.search(query, 20, ranked=ranked)
+            timings.append(time.perf_counter() - start)
+        print(f"log search {query!r:<12} LIKE {scan * 1000:7.2f} ms  ranked {timings[0] * 1000:7.2f} ms"
+              f"  recent {timings[1] * 1000:7.2f} ms")
+
+
+def bench_cold_start() -> None:
+    "startup to first screens with loose asset files against the packed bundle."
+    directory = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as bundle_dir:
+        bundle = os.path.join(bundle_dir, "assets.rcc")
+        build_bundle(bundle)
+
+        for label, mode in [("loose files", "loose"), ("bundle", bundle)]:
+            timings = list()
+            for i in range(COLD_STARTS):
+                output = subprocess.run([sys.executable, "-c", COLD_START_SCRIPT], cwd=directory,
+                                        env=dict(os.environ, NAAR_RAAN_ASSETS=mode),
+                                        capture_output=True, text=True, check=True).stdout.split()
+                assert output[0] == str(mode != "loose")
+                timings.append(float(output[1]))
+            stats = summarize(timings)
+            print(f"cold start ({label:<11}) mean {stats['mean_ms']:7.1f} ms  min {stats['min_ms']:7.1f} ms")
+
+
+def main() -> int:
+    app = QApplication(sys.argv)
+    bench_stylesheet(app)
+    bench_list_view(app)
+    bench_engine_profiles()
+    bench_login(app)
+    passed = bench_login_cycles(app)
+    bench_detail_pool(app)
+    bench_cold_start()
+    bench_search()
+    bench_full_text()
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
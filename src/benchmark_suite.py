@@ -0,0 +1,451 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# seeded databases are cached here between runs, every run works on a fresh copy
+BENCH_DIR = os.environ.get("NAAR_RAAN_BENCH_DIR", os.path.join(
+    tempfile.gettempdir(), "naar_raan_bench"))
+WORK_DB = os.path.join(BENCH_DIR, "work.db")
+os.makedirs(BENCH_DIR, exist_ok=True)
+for suffix in ["", "-wal", "-shm"]:
+    if os.path.exists(WORK_DB + suffix):
+        os.remove(WORK_DB + suffix)
+shutil.rmtree(os.path.join(BENCH_DIR, "archive"), ignore_errors=True)
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["NAAR_RAAN_DB"] = WORK_DB
+os.environ["NAAR_RAAN_ARCHIVE"] = os.path.join(BENCH_DIR, "archive")
+
+from PySide6 import __version__ as PYSIDE_VERSION
+from PySide6.QtWidgets import QApplication
+from theme import Theme
+from views import *
+from models import *
+from controllers import *
+from data.orm.schema import engine, migrate, Schema
+from data.orm.data_access_object import AppDAO, UserCache
+from benchmark_tools import settle, summarize
+
+PRODUCTS = 10000
+RECEIPTS = 1000000
+LOGS = 200000
+# receipts and logs are spread over this many days up to now
+HISTORY_DAYS = 730
+SEED = 2022
+REPEAT = 20
+# a median this much slower than the baseline, and by more than NOISE_MS, is a regression
+THRESHOLD = 0.2
+NOISE_MS = 0.05
+
+BENCH_PASSWORD = "bench"
+
+
+def seed_path(products: int, receipts: int, logs: int) -> str:
+    return os.path.join(BENCH_DIR, f"seed-{products}-{receipts}-{logs}.db")
+
+
+def seed_database(path: str, products: int, receipts: int, logs: int) -> None:
+    """
+    fill the empty database at path with two users, products split between drinks
+    and bakeries, receipts with one to three order lines each and logs.\n
+    the rows are generated from SEED, so every seeded database is the same.
+    """
+    rng = random.Random(SEED)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=OFF")
+
+    connection.executemany("INSERT INTO USERS(first_name, last_name, username, password, access_level) VALUES (?, ?, ?, ?, ?)", [
+        ("Bench", "Admin", "bench_admin", BENCH_PASSWORD, "admin"),
+        ("Bench", "Staff", "bench_staff", BENCH_PASSWORD, "staff")])
+
+    drinks = products // 2
+    connection.executemany("INSERT INTO DRINKS(name, hprice, cprice, bprice) VALUES (?, ?, ?, ?)", (
+        (f"Drink {i:05d}", price, price + 5, price + 10)
+        for i, price in ((i, float(rng.randrange(30, 90))) for i in range(drinks))))
+    connection.executemany("INSERT INTO BAKERIES(name, price) VALUES (?, ?)", (
+        (f"Bakery {i:05d}", float(rng.randrange(20, 120))) for i in range(products - drinks)))
+
+    now = int(time.time())
+    start = now - HISTORY_DAYS * 24 * 60 * 60
+
+    def stamp(i: int, count: int) -> tuple[str, str, int]:
+        timestamp = start + (now - start) * i // count
+        moment = datetime.fromtimestamp(timestamp)
+        return f"{moment.day:02d}-{moment.month:02d}-{moment.year}", f"{moment.hour:02d}:{moment.minute:02d}", timestamp
+
+    def receipt_rows():
+        for i in range(receipts):
+            lines = [(rng.randrange(1, drinks + 1), rng.randrange(1, 4), float(rng.randrange(30, 90)))
+                     for _ in range(rng.randrange(1, 4))]
+            total = sum(quantity * price for _, quantity, price in lines)
+            yield (*stamp(i, receipts), f"Income: {total:.2f}"), lines
+
+    batch = list()
+    receipt_id = 0
+    for receipt, lines in receipt_rows():
+        receipt_id += 1
+        batch.append((receipt_id, receipt, lines))
+        if len(batch) == 10000:
+            insert_receipts(connection, batch)
+            batch.clear()
+    insert_receipts(connection, batch)
+
+    verbs = ["Add", "Update", "Delete"]
+    connection.executemany("INSERT INTO LOGS(date, time, timestamp, description) VALUES (?, ?, ?, ?)", (
+        (*stamp(i, logs), f"{rng.choice(verbs)} Drink {rng.randrange(drinks):05d} from system.") for i in range(logs)))
+
+    connection.commit()
+    connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    connection.close()
+
+
+def insert_receipts(connection: sqlite3.Connection, batch: list) -> None:
+    connection.executemany("INSERT INTO RECEIPTS(id, date, time, timestamp, description) VALUES (?, ?, ?, ?, ?)",
+                           [(id, *receipt) for id, receipt, lines in batch])
+    connection.executemany("INSERT INTO ORDER_LINES(receipt_id, item_type, item_id, name, variant, quantity, price) VALUES (?, 'drink', ?, ?, 'Hot', ?, ?)",
+                           [(id, item_id, f"Drink {item_id - 1:05d}", quantity, price)
+                            for id, receipt, lines in batch for item_id, quantity, price in lines])
+
+
+def prepare(products: int, receipts: int, logs: int) -> float:
+    """
+    put a fresh copy of the seeded database in place of the work database, seeding it
+    first if this size was never seeded. a cached seed made by an older version is
+    migrated like any other database. return the seconds spent seeding, 0 if cached.
+    """
+    engine.dispose()
+    seed = seed_path(products, receipts, logs)
+    seconds = 0.0
+    if not os.path.exists(seed):
+        start = time.perf_counter()
+        seed_database(WORK_DB, products, receipts, logs)
+        seconds = time.perf_counter() - start
+        shutil.copy(WORK_DB, seed)
+    else:
+        for suffix in ["-wal", "-shm"]:
+            if os.path.exists(WORK_DB + suffix):
+                os.remove(WORK_DB + suffix)
+        shutil.copy(seed, WORK_DB)
+        Schema.metadata.create_all(engine)
+        migrate()
+    Catalog.invalidate()
+    UserCache.invalidate()
+    return seconds
+
+
+class Root:
+    "stands in for Application so LoginPage and HomePage can be measured on their own."
+
+    def __init__(self):
+        self.current_user = None
+
+    def set_current_user(self, user: User) -> None:
+        self.current_user = user
+
+    def initialize_page(self) -> None:
+        pass
+
+    def move_to_login(self) -> None:
+        self.current_user = None
+
+
+class Suite:
+    """
+    time every benchmark REPEAT times and keep the statistics by name.\n
+    setup(i) runs before sample i and its result is passed to function, teardown gets
+    what function returned. neither is timed.
+    """
+
+    def __init__(self, app: QApplication, repeat: int = REPEAT, only: str = None):
+        self.app = app
+        self.repeat = repeat
+        self.only = only
+        self.results = dict()
+
+    def measure(self, name: str, function, setup=None, teardown=None, repeat: int = None) -> None:
+        if self.only is not None and self.only not in name:
+            return
+        samples = list()
+        for i in range(repeat or self.repeat):
+            argument = setup(i) if setup is not None else None
+            start = time.perf_counter()
+            result = function(argument) if setup is not None else function()
+            samples.append(time.perf_counter() - start)
+            if teardown is not None:
+                teardown(result)
+        self.results[name] = summarize(samples)
+        result = self.results[name]
+        print(f"{name:<44} median {result['median_ms']:9.3f} ms  p95 {result['p95_ms']:9.3f} ms")
+
+
+def bench_pages(suite: Suite) -> None:
+    "the controller entry points a user waits on, each until its result is on screen."
+    app = suite.app
+    user_dao = AppDAO.get_dao("user")
+    admin = user_dao.get_user_by_username("bench_admin")
+    AppDAO.release()
+
+    login_page = LoginPage(Root(), LoginView(), LoginModel())
+    login_page.view.lineEdit_username.setText("bench_admin")
+    login_page.view.lineEdit_password.setText(BENCH_PASSWORD)
+
+    def verify_login() -> None:
+        login_page.verify_login()
+        settle(app)
+    suite.measure("LoginPage.verify_login (cold cache)", lambda argument: verify_login(),
+                  setup=lambda i: UserCache.invalidate())
+    suite.measure("LoginPage.verify_login (warm cache)", verify_login)
+    login_page.dispose()
+
+    def build_home() -> HomePage:
+        home_page = HomePage(Root(), HomeView(), HomeModel(), admin)
+        home_page.view.show()
+        app.processEvents()
+        return home_page
+
+    def dispose_home(home_page: HomePage) -> None:
+        home_page.view.hide()
+        settle(app)
+        home_page.dispose()
+        settle(app)
+    suite.measure("HomePage (admin)", lambda i: build_home(), setup=lambda i: Catalog.invalidate(),
+                  teardown=dispose_home, repeat=max(suite.repeat // 4, 3))
+
+    home_page = build_home()
+    for i in range(5):
+        settle(app)
+    order_page = home_page.order_page
+
+    def reload(page) -> None:
+        Catalog.invalidate()
+        page.load_item()
+        app.processEvents()
+    suite.measure("OrderList.load_item (catalog reload)",
+                  lambda: reload(order_page.order_list))
+    menu_page = home_page.pages.get("menu")
+    menu_page.view.show()
+    suite.measure("MenuPage.load_item (catalog reload)", lambda: reload(menu_page))
+
+    for name in ["log", "receipt"]:
+        page = home_page.pages.get(name)
+        page.view.show()
+
+        def initialize(page=page) -> None:
+            page.initialize()
+            settle(app)
+        suite.measure(f"{type(page).__name__}.initialize", initialize)
+
+    products = Catalog.get_products()
+
+    def fill_cart(i: int) -> None:
+        for product in products[i * 3:i * 3 + 3]:
+            if isinstance(product, Drink):
+                order_page.add_to_cart(product, product.get_hprice(), product.get_name(), "Hot")
+            else:
+                order_page.add_to_cart(product, product.get_price(), product.get_name())
+
+    def confirm_order(argument) -> None:
+        order_page.confirm_order()
+        settle(app)
+    suite.measure("OrderPage.confirm_order", confirm_order, setup=fill_cart)
+
+    home_page.dispose()
+    settle(app)
+
+
+def bench_daos(suite: Suite) -> None:
+    "every DAO method against the seeded tables."
+    user_dao = AppDAO.get_dao("user")
+    drink_dao = AppDAO.get_dao("drink")
+    bakery_dao = AppDAO.get_dao("bakery")
+    log_dao = AppDAO.get_dao("log")
+    receipt_dao = AppDAO.get_dao("receipt")
+    admin = user_dao.get_user_by_username("bench_admin")
+
+    suite.measure("UserDAO.get_user_by_username (cold cache)", lambda i: user_dao.get_user_by_username("bench_admin"),
+                  setup=lambda i: UserCache.invalidate())
+    suite.measure("UserDAO.get_user_by_id",
+                  lambda: user_dao.get_user_by_id(admin.get_id()))
+    suite.measure("UserDAO.get_all_users", user_dao.get_all_users)
+    suite.measure("UserDAO.add_user", lambda i: user_dao.add_user(
+        User("Bench", "User", f"bench_user_{i}", BENCH_PASSWORD, "staff")), setup=lambda i: i)
+    suite.measure("UserDAO.upsert_user", lambda i: user_dao.upsert_user(
+        User("Bench", "User", f"bench_user_{i}", "changed", "staff")), setup=lambda i: i)
+    suite.measure("UserDAO.update_user", lambda i: user_dao.update_user(
+        admin.get_id(), fname=f"Admin {i}"), setup=lambda i: i)
+    suite.measure("UserDAO.delete_user_by_id", lambda i: user_dao.delete_user_by_id(
+        user_dao.get_user_by_username(f"bench_user_{i}").get_id()), setup=lambda i: i)
+
+    for dao, schema, plural in [(drink_dao, Drink, "drinks"), (bakery_dao, Bakery, "bakeries")]:
+        prefix = type(dao).__name__
+        name = schema.__name__.lower()
+        get_all = getattr(dao, f"get_all_{plural}")
+        get_by_id = getattr(dao, f"get_{name}_by_id")
+        add = getattr(dao, f"add_{name}")
+        add_many = getattr(dao, f"add_{plural}")
+        upsert = getattr(dao, f"upsert_{name}")
+        update = getattr(dao, f"update_{name}")
+        delete_by_id = getattr(dao, f"delete_{name}_by_id")
+
+        def make(label: str, i: int, schema=schema):
+            if schema is Drink:
+                return Drink(f"Bench {label} {i}", 40.0, 45.0, 50.0)
+            return Bakery(f"Bench {label} {i}", 40.0)
+
+        suite.measure(f"{prefix}.get_all_{plural}", get_all, teardown=lambda rows: AppDAO.release(),
+                      repeat=max(suite.repeat // 4, 3))
+        suite.measure(f"{prefix}.get_{name}_by_id", lambda i: get_by_id(i + 1),
+                      setup=lambda i: i, teardown=lambda row: AppDAO.release())
+        suite.measure(f"{prefix}.get_names", dao.get_names)
+        added = list()
+        suite.measure(f"{prefix}.add_{name}", lambda item: add(item), setup=lambda i: added.append(make("one", i)) or added[-1])
+        suite.measure(f"{prefix}.add_{plural} (100)", lambda items: add_many(items),
+                      setup=lambda i: [make(f"many {i}", j) for j in range(100)])
+        suite.measure(f"{prefix}.upsert_{name}", lambda item: upsert(item),
+                      setup=lambda i: make("one", i))
+        suite.measure(f"{prefix}.update_{name}", lambda item: update(item.get_id(), name=item.get_name() + " new"),
+                      setup=lambda i: added[i])
+        suite.measure(f"{prefix}.delete_{name}_by_id", lambda item: delete_by_id(item.get_id()),
+                      setup=lambda i: added[i])
+
+    newest = log_dao.page_before(None, 1)[0]
+    middle = newest.get_id() // 2
+    day = datetime.fromtimestamp(newest.get_timestamp()) - timedelta(days=HISTORY_DAYS // 2)
+    suite.measure("LogDAO.add_log", lambda i: log_dao.add_log(Log(f"Bench log {i}")),
+                  setup=lambda i: i, teardown=lambda result: log_dao.flush())
+    def queue_logs(i: int) -> None:
+        for j in range(64):
+            log_dao.add_log(Log(f"Bench flush {i} {j}"))
+    suite.measure("LogDAO.flush (64 queued)", lambda argument: log_dao.flush(),
+                  setup=queue_logs)
+    suite.measure("LogDAO.get_all_logs", log_dao.get_all_logs)
+    suite.measure("LogDAO.page_before (middle)",
+                  lambda: log_dao.page_before(middle))
+    suite.measure("LogDAO.page_after (middle)",
+                  lambda: log_dao.page_after(middle))
+    suite.measure("LogDAO.page_between (one day)",
+                  lambda: log_dao.page_between(day, day + timedelta(days=1)))
+    suite.measure("LogDAO.search (ranked)",
+                  lambda: log_dao.search("drink 0042"))
+    suite.measure("LogDAO.search (newest first)",
+                  lambda: log_dao.search("update", ranked=False))
+    suite.measure("LogDAO.count", log_dao.count)
+    suite.measure("LogDAO.stream (10k rows)", lambda: sum(
+        1 for _, row in zip(range(10000), log_dao.stream())), repeat=max(suite.repeat // 4, 3))
+
+    newest = receipt_dao.page_before(None, 1)[0]
+    middle = newest.get_id() // 2
+    suite.measure("ReceiptDAO.add_receipt_with_lines", lambda i: receipt_dao.add_receipt_with_lines(
+        Receipt("Income: 135.00"), [OrderLine("drink", 1, "Drink 00000", "Hot", 1, 45.0) for _ in range(3)]), setup=lambda i: i)
+    suite.measure("ReceiptDAO.add_receipt",
+                  lambda i: receipt_dao.add_receipt(Receipt("Income: 45.00")), setup=lambda i: i)
+    suite.measure("ReceiptDAO.get_lines", lambda: receipt_dao.get_lines(middle))
+    suite.measure("ReceiptDAO.get_all_receipts", receipt_dao.get_all_receipts)
+    suite.measure("ReceiptDAO.page_before (middle)",
+                  lambda: receipt_dao.page_before(middle))
+    suite.measure("ReceiptDAO.page_after (middle)",
+                  lambda: receipt_dao.page_after(middle))
+    suite.measure("ReceiptDAO.page_between (one day)",
+                  lambda: receipt_dao.page_between(day, day + timedelta(days=1)))
+    suite.measure("ReceiptDAO.search (ranked)",
+                  lambda: receipt_dao.search("135.00"))
+    suite.measure("ReceiptDAO.count", receipt_dao.count,
+                  repeat=max(suite.repeat // 4, 3))
+    suite.measure("ReceiptDAO.stream (10k rows)", lambda: sum(
+        1 for _, row in zip(range(10000), receipt_dao.stream())), repeat=max(suite.repeat // 4, 3))
+    AppDAO.release()
+
+
+def git_commit() -> str:
+    "the commit being measured, None outside a git checkout."
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, results: dict, threshold: float = THRESHOLD) -> list[str]:
+    "print every benchmark's median against baseline, return the names that regressed."
+    regressions = list()
+    for name, result in results["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<44} new")
+            continue
+        ratio = result["median_ms"] / before["median_ms"] if before["median_ms"] > 0 else 1.0
+        regressed = ratio > 1 + threshold and result["median_ms"] - before["median_ms"] > NOISE_MS
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<44} {before['median_ms']:9.3f} -> {result['median_ms']:9.3f} ms  x{ratio:5.2f}"
+              f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="headless benchmarks of the pages and DAOs on seeded databases")
+    parser.add_argument("--products", type=int, default=PRODUCTS)
+    parser.add_argument("--receipts", type=int, default=RECEIPTS)
+    parser.add_argument("--logs", type=int, default=LOGS)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--only", help="run the benchmarks whose name contains this")
+    parser.add_argument("--output", help="write the results to this JSON file, "
+                        "by default results-<time>.json in the bench directory")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    Theme.apply(app)
+    seconds = prepare(args.products, args.receipts, args.logs)
+    if seconds > 0:
+        print(f"seeded {args.products} products, {args.receipts} receipts, {args.logs} logs in {seconds:.1f} s")
+
+    suite = Suite(app, args.repeat, args.only)
+    bench_pages(suite)
+    bench_daos(suite)
+    AppDAO.shutdown()
+
+    results = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "pyside": PYSIDE_VERSION,
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "products": args.products,
+            "receipts": args.receipts,
+            "logs": args.logs,
+            "repeat": args.repeat
+        },
+        "results": suite.results
+    }
+    output = args.output or os.path.join(
+        BENCH_DIR, f"results-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare is not None:
+        with open(args.compare, "r") as file:
+            regressions = compare(json.load(file), results, args.threshold)
+        if len(regressions) > 0:
+            print(f"{len(regressions)} regressions")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+import statistics
+
+from PySide6.QtCore import QCoreApplication, QEvent
+from PySide6.QtWidgets import QApplication
+
+from executor import DAOExecutor
+
+
+def settle(app: QApplication) -> None:
+    "run pending callbacks, idle work and deleteLater calls."
+    DAOExecutor.wait()
+    app.processEvents()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+def summarize(samples: list[float]) -> dict:
+    "milliseconds statistics of samples in seconds."
+    samples = sorted(sample * 1000 for sample in samples)
+    return {
+        "samples": len(samples),
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "mean_ms": round(statistics.mean(samples), 4),
+        "max_ms": round(samples[-1], 4)
+    }
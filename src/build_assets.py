@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import tempfile
+from xml.sax.saxutils import escape
+
+from assets import Assets
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# packed into the bundle, relative to ROOT_DIR, with the file types Assets and Theme load
+SOURCES = {
+    f"asset/{Assets.IMAGE_DIR}": (".png", ".jpg", ".jpeg"),
+    f"asset/{Assets.SVG_DIR}": (".svg",),
+    Assets.FONT_DIR: (".ttf", ".otf"),
+    "theme.qss": (".qss",)
+}
+
+
+def list_sources() -> list[str]:
+    """
+    return every file to pack as a path relative to ROOT_DIR.\n
+    hidden files and folders (.DS_Store, ...) and files of other types are left out.
+    """
+    files = list()
+    for source, extensions in SOURCES.items():
+        path = os.path.join(ROOT_DIR, source)
+        if os.path.isfile(path):
+            files.append(source)
+        for directory, folders, file_names in os.walk(path):
+            folders[:] = sorted(
+                folder for folder in folders if not folder.startswith("."))
+            for file_name in sorted(file_names):
+                if file_name.startswith(".") or not file_name.lower().endswith(extensions):
+                    continue
+                files.append(os.path.relpath(
+                    os.path.join(directory, file_name), ROOT_DIR).replace(os.sep, "/"))
+    return files
+
+
+def build_bundle(output: str = Assets.BUNDLE_PATH) -> int:
+    """
+    pack the assets, fonts and theme.qss into one binary Qt resource file.\n
+    files are stored uncompressed (the images already are), so at runtime they are
+    served straight from the memory-mapped bundle. return the number of files packed.
+    """
+    files = list_sources()
+    entries = "\n".join(
+        f'        <file alias="{escape(name)}">{escape(os.path.join(ROOT_DIR, name))}</file>' for name in files)
+    qrc = f'<!DOCTYPE RCC>\n<RCC version="1.0">\n    <qresource prefix="/">\n{entries}\n    </qresource>\n</RCC>\n'
+
+    with tempfile.TemporaryDirectory() as directory:
+        qrc_path = os.path.join(directory, "assets.qrc")
+        with open(qrc_path, "w") as file:
+            file.write(qrc)
+        subprocess.run(["pyside6-rcc", "--binary", "--no-compress",
+                       "-o", output, qrc_path], check=True)
+    return len(files)
+
+
+if __name__ == "__main__":
+    output = sys.argv[1] if len(sys.argv) > 1 else Assets.BUNDLE_PATH
+    print(f"packed {build_bundle(output)} files into {output}")
@@ -21,6 +21,17 @@ class Controller:
             return
         self.view.show()
 
+    def dispose(self) -> None:
+        "free the view (and its children) once control is back in the event loop."
+        if self.view is None:
+            return
+        self.view.deleteLater()
+        self.view = None
+
+    def is_disposed(self) -> bool:
+        "True once dispose ran, DAOExecutor callbacks that arrive later must do nothing."
+        return self.view is None
+
 
 class LoginPage(Controller):
     view: LoginView
@@ -35,11 +46,14 @@ class LoginPage(Controller):
         username = self.view.get_username()
         password = self.view.get_password()
         self.model.get_input(username, password)
-        self.model.retrive_user(username)
+        self.view.set_loading(True)
+        self.model.load_user(username, self.on_user_loaded)
+
+    def on_user_loaded(self) -> None:
+        self.view.set_loading(False)
         self.model.verify_login()
 
         if self.model.is_valid():
-            self.model.set_current_user(username)
             self.set_current_user(self.get_current_user())
             self.__root.initialize_page()
             self.view.hide_error_label()
@@ -56,10 +70,118 @@ class LoginPage(Controller):
         self.view.clear_info()
 
 
+class PageRegistry:
+    """
+    builds the sub pages of a stacked widget on first navigation.\n
+    a page is registered with a factory and only costs something once it is shown,
+    or once prewarm gets to it while the event loop is idle.
+    """
+
+    def __init__(self, stacked_widget: QStackedWidget):
+        self.__stacked_widget = stacked_widget
+        self.__factories: dict = dict()
+        self.__pages: dict[str, Controller] = dict()
+        self.__pending: list[str] = list()
+
+        # zero interval timer fires whenever the event loop is idle,
+        # it is a child of the stacked widget so it goes away with the page tree
+        self.__idle_timer = QTimer(stacked_widget)
+        self.__idle_timer.setInterval(0)
+        self.__idle_timer.timeout.connect(self.__build_next)
+
+    def register(self, name: str, factory) -> None:
+        "factory() returns the page controller."
+        self.__factories[name] = factory
+
+    def is_registered(self, name: str) -> bool:
+        return name in self.__factories
+
+    def is_built(self, name: str) -> bool:
+        return name in self.__pages
+
+    def get(self, name: str) -> Controller:
+        "return the page, building it and adding its view on first use."
+        if name not in self.__pages:
+            page = self.__factories[name]()
+            self.__stacked_widget.addWidget(page.view)
+            self.__pages[name] = page
+        return self.__pages[name]
+
+    def show(self, name: str) -> Controller:
+        page = self.get(name)
+        self.__stacked_widget.setCurrentWidget(page.view)
+        return page
+
+    def prewarm(self, names: list[str] = None) -> None:
+        "build the pages in idle time, one per pass of the event loop."
+        self.__pending = [name for name in (names or list(self.__factories))
+                          if not self.is_built(name)]
+        if len(self.__pending) > 0:
+            self.__idle_timer.start()
+
+    def dispose(self) -> None:
+        "dispose every built page, they go away with the stacked widget."
+        self.__idle_timer.stop()
+        self.__pending.clear()
+        for page in self.__pages.values():
+            page.dispose()
+        self.__pages.clear()
+
+    def __build_next(self) -> None:
+        if len(self.__pending) > 0:
+            self.get(self.__pending.pop(0))
+        if len(self.__pending) == 0:
+            self.__idle_timer.stop()
+
+
+class PageLifecycle:
+    """
+    owns the HomePage tree of the logged in user.\n
+    the tree is kept on logout and reused when the same user logs back in,
+    any other login frees it before the new tree is built.
+    """
+
+    def __init__(self, stack: QStackedWidget, factory):
+        "factory(user) returns a new HomePage."
+        self.__stack = stack
+        self.__factory = factory
+        self.__home_page: HomePage = None
+        self.__user: User = None
+
+    def get_page(self) -> "HomePage":
+        return self.__home_page
+
+    def open(self, user: User) -> "HomePage":
+        "return the page tree for user, reusing the last one if it belongs to the same user."
+        if self.__home_page is not None and self.__is_same_user(user):
+            self.__home_page.move_to_order_page()
+            return self.__home_page
+
+        self.dispose()
+        self.__home_page = self.__factory(user)
+        self.__user = user
+        self.__stack.addWidget(self.__home_page.view)
+        return self.__home_page
+
+    def dispose(self) -> None:
+        "remove the page tree from the stack and free it."
+        if self.__home_page is None:
+            return
+        self.__stack.removeWidget(self.__home_page.view)
+        self.__home_page.dispose()
+        self.__home_page = None
+        self.__user = None
+
+    def __is_same_user(self, user: User) -> bool:
+        return (self.__user.get_id() == user.get_id()
+                and self.__user.get_access_level() == user.get_access_level())
+
+
 class HomePage(Controller):
     """master page"""
     view: HomeView
     model: HomeModel
+    PREWARM = True
 
     def __init__(self, root, view: QWidget, model: Model, user: User):
         super().__init__(view, model)
@@ -68,23 +190,20 @@ class HomePage(Controller):
         self.view.set_logout_button_listener(self.__root.move_to_login)
         self.__admin_access = (user.get_access_level() == "admin")
 
-        # sub page
-        self.order_page = OrderPage(OrderView(), OrderModel())
-        self.log_page = LogPage(LogView(), LogModel())
-        self.receipt_page = ReceiptPage(ReceiptView(), ReceiptModel())
-        self.menu_page = MenuPage(MenuView(), MenuModel())
-
-        self.view.stacked_widget.addWidget(self.order_page.view)
+        # sub page, built on first navigation
+        self.pages = PageRegistry(self.view.stacked_widget)
+        self.pages.register(
+            "order", lambda: OrderPage(OrderView(), OrderModel()))
         self.view.set_home_button_listener(self.move_to_order_page)
 
         if self.__admin_access:
             self.view.show_admin_button()
-            # self.account_page = AccountPage(AccountView(), AccountModel())
-
-            self.view.add_view(self.log_page.view)
-            self.view.add_view(self.receipt_page.view)
-            self.view.add_view(self.menu_page.view)
-            # self.view.add_view(self.account_page.view)
+            self.pages.register("log", lambda: LogPage(LogView(), LogModel()))
+            self.pages.register(
+                "receipt", lambda: ReceiptPage(ReceiptView(), ReceiptModel()))
+            self.pages.register(
+                "menu", lambda: MenuPage(MenuView(), MenuModel()))
+            # self.pages.register("account", lambda: AccountPage(AccountView(), AccountModel(user)))
 
             self.view.set_log_button_listener(self.move_to_log_page)
             self.view.set_receipt_button_listener(self.move_to_receipt_page)
@@ -94,27 +213,38 @@ class HomePage(Controller):
         else:
             self.view.hide_admin_button()
 
+        # the order page is the landing page
+        self.pages.get("order")
+        if HomePage.PREWARM:
+            self.pages.prewarm()
+
+    def dispose(self) -> None:
+        self.pages.dispose()
+        Controller.dispose(self)
+
+    @property
+    def order_page(self) -> "OrderPage":
+        return self.pages.get("order")
+
     def move_to_order_page(self) -> None:
         self.order_page.order_list.load_item()
-        self.view.stacked_widget.setCurrentIndex(0)
+        self.pages.show("order")
 
     def move_to_log_page(self) -> None:
         if self.__admin_access:
-            self.log_page.initialize()
-            self.view.stacked_widget.setCurrentIndex(1)
+            self.pages.show("log").initialize()
 
     def move_to_receipt_page(self) -> None:
         if self.__admin_access:
-            self.receipt_page.initialize()
-            self.view.stacked_widget.setCurrentIndex(2)
+            self.pages.show("receipt").initialize()
 
     def move_to_menu_page(self) -> None:
         if self.__admin_access:
-            self.view.stacked_widget.setCurrentIndex(3)
+            self.pages.show("menu")
 
     # def move_to_account_page(self) -> None:
     #     if self.__admin_access:
-    #         self.view.stacked_widget.setCurrentIndex(4)
+    #         self.pages.show("account")
 
 
 class OrderPage(Controller):
@@ -126,7 +256,14 @@ class OrderPage(Controller):
 
         # sub view
         self.order_list: OrderList = None
-        self.total = 0.0
+        self.cart: CartModel = self.model.get_cart()
+        # one row per cart line, rendered from the line
+        self.rows: dict[tuple, OrderItem] = dict()
+
+        # detail and cart row views are reused from one tap to the next
+        self.drink_detail_pool = ViewPool(self.view, DrinkDetailView, 2, 1)
+        self.bakery_detail_pool = ViewPool(self.view, BakeryDetailView, 2, 1)
+        self.order_item_pool = ViewPool(self.view, OrderItemView, 32, 4)
 
         self.initialize()
         self.view.set_order_button_listener(lambda: self.confirm_order())
@@ -136,19 +273,63 @@ class OrderPage(Controller):
 
         self.view.insert_view(self.order_list.view, 0)
 
-    def increase_total(self, value: float):
-        self.total += value
-        self.view.set_total(self.total)
+    def add_to_cart(self, product: Drink | Bakery, price: float, name: str, variant: str = None) -> None:
+        "add one product, merging into its row when the same product and variant is there."
+        self.render_line(self.cart.add(product, price, name, variant))
+
+    def change_quantity(self, key: tuple, delta: int) -> None:
+        self.render_line(self.cart.change_quantity(key, delta))
+
+    def render_line(self, line: CartLine) -> None:
+        "bring the line's row and the total in sync with the cart."
+        if line is None:
+            return
+        key = line.get_key()
+        row = self.rows.get(key)
+        if line.get_quantity() == 0:
+            if row is not None:
+                self.remove_row(self.rows.pop(key))
+        elif row is None:
+            row = OrderItem(self, line)
+            self.rows[key] = row
+            self.view.vBox.addWidget(row.view)
+            # pooled views come back hidden
+            row.view.show()
+        else:
+            row.render(line)
+        self.view.set_total(self.cart.get_total())
 
-    def decrease_total(self, value: float):
-        self.total -= value
-        self.view.set_total(self.total)
+    def remove_row(self, row: "OrderItem") -> None:
+        self.view.vBox.removeWidget(row.view)
+        self.order_item_pool.release(row.view)
+        row.view = None
 
     def confirm_order(self) -> None:
-        receipt = Receipt(f"Income: {self.total:.02f}")
-        self.model.make_new_receipt(receipt)
-        self.view.reset()
-        self.total = 0.0
+        if self.cart.is_empty():
+            return
+        receipt = Receipt(f"Income: {self.cart.get_total()}")
+        lines = self.cart.get_order_lines()
+        # the cart stays editable while the receipt is saved, remember what was sent
+        submitted = [(line.get_key(), line.get_quantity())
+                     for line in self.cart.get_lines()]
+        self.view.set_loading(True)
+        self.model.make_new_receipt_async(
+            receipt, lines, lambda: self.on_order_saved(submitted), self.on_order_failed)
+
+    def on_order_saved(self, submitted: list[tuple[tuple, int]]) -> None:
+        "take the submitted quantities out of the cart, whatever was added since stays."
+        if self.is_disposed():
+            return
+        self.view.set_loading(False)
+        for key, quantity in submitted:
+            self.render_line(self.cart.change_quantity(key, -quantity))
+
+    def on_order_failed(self, error: Exception) -> None:
+        "keep the cart so the order can be sent again."
+        if self.is_disposed():
+            return
+        self.view.set_loading(False)
+        self.view.show_error_label()
 
 
 class OrderList(Controller):
@@ -160,41 +341,40 @@ class OrderList(Controller):
     def __init__(self, parent: Controller, view: QWidget, model: Model):
         super().__init__(view, model)
         self.parent = parent
+        self.__catalog_version = None
+        self.__filtered = False
+        self.view.set_item_click_listener(self.on_click)
+        self.view.set_search_listener(lambda text: self.show_products())
         self.load_item()
 
     def load_item(self) -> None:
-        self.view.clear__scrollarea()
-        item_list = self.model.get_all_products()
-        for item in item_list:
-            self.view.add_widget_to_scrollarea(self.__create_item_widget(item))
-
-    def __create_item_widget(self, item) -> OrderListItemView:
-        order_listitem = OrderListItem(
-            self.parent, OrderListItemView(), item)
-        return order_listitem.view
-
-
-class OrderListItem(Controller):
-    parent: OrderPage
-    view: OrderListItemView
-
-    def __init__(self, parent: Controller, view: QWidget, item: object):
-        super().__init__(view, None)
-        self.parent = parent
-        self.item = item
-
-        self.view.set_itemname(self.item.get_name())
-        self.view.set_button_listener(lambda: self.on_click())
+        "reconcile the list with the catalog, nothing to do if it did not change."
+        if self.__catalog_version == self.model.get_catalog_version():
+            return
+        self.show_products()
+        self.__catalog_version = self.model.get_catalog_version()
+
+    def show_products(self) -> None:
+        "list the products matching the search bar, or all of them when it is empty."
+        query = self.view.get_searched_item()
+        if query.strip() != "":
+            self.view.set_items(self.model.search(query))
+            self.__filtered = True
+        elif self.__filtered:
+            self.view.set_items(self.model.get_all_products())
+            self.__filtered = False
+        else:
+            self.view.reconcile_items(self.model.get_all_products())
 
-    def on_click(self) -> None:
-        if isinstance(self.item, Drink):
+    def on_click(self, item: Drink | Bakery) -> None:
+        if isinstance(item, Drink):
             drink_detail = DrinkDetail(
-                self.parent, DrinkDetailView(), self.item)
+                self.parent, self.parent.drink_detail_pool.acquire(), item)
             self.parent.view.insert_view(drink_detail.view, 1)
 
         else:
             bakery_detail = BakeryDetail(
-                self.parent, BakeryDetailView(), self.item)
+                self.parent, self.parent.bakery_detail_pool.acquire(), item)
             self.parent.view.insert_view(bakery_detail.view, 1)
 
         self.parent.view.move_to_index(1)
@@ -222,7 +402,13 @@ class DrinkDetail(Controller):
             self.view.set_bbtn_able(False)
 
     def cancel_order(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        "leave the detail and hand its view back to the pool."
         self.parent.view.stacked_widget.removeWidget(self.view)
+        self.parent.drink_detail_pool.release(self.view)
+        self.view = None
 
     def add_order(self) -> None:
         curr_price = 0.0
@@ -233,10 +419,9 @@ class DrinkDetail(Controller):
         elif self.view.get_drink_type() == "Blended":
             curr_price = self.item.get_bprice()
 
-        order_item = OrderItem(self.view.get_detail(),
-                               curr_price, parent=self.parent)
-        self.parent.view.vBox.addWidget(order_item.view)
-        self.parent.view.stacked_widget.removeWidget(self.view)
+        self.parent.add_to_cart(self.item, curr_price,
+                                self.view.get_detail(), self.view.get_variant())
+        self.close()
 
 
 class BakeryDetail(Controller):
@@ -255,51 +440,44 @@ class BakeryDetail(Controller):
         self.view.set_add_button_listener(lambda: self.add_order())
 
     def cancel_order(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        "leave the detail and hand its view back to the pool."
         self.parent.view.stacked_widget.removeWidget(self.view)
+        self.parent.bakery_detail_pool.release(self.view)
+        self.view = None
 
     def add_order(self) -> None:
-        order_item = OrderItem(self.item.get_name()[0:11],
-                               self.item.get_price(), parent=self.parent)
-        self.parent.view.vBox.addWidget(order_item.view)
-        self.parent.view.stacked_widget.removeWidget(self.view)
+        self.parent.add_to_cart(
+            self.item, self.item.get_price(), self.item.get_name()[0:11])
+        self.close()
 
 
 class OrderItem(Controller):
+    "cart row, a view of one CartLine."
     parent: OrderPage
     view: OrderItemView
 
-    def __init__(self, item_name: str, price: float = 0.0, quantity: int = 1, parent: Controller = None):
-        super().__init__(OrderItemView(), None)
+    def __init__(self, parent: OrderPage, line: CartLine):
+        super().__init__(parent.order_item_pool.acquire(), None)
         self.parent = parent
-        self.view.set_item_name(item_name)
-        self.price = price
-        self.quantity = quantity
-
-        self.view.set_quantity(self.quantity)
-        self.view.set_price_label(self.price * self.quantity)
-        self.parent.increase_total(self.price)
+        self.key = line.get_key()
+        self.render(line)
 
         self.view.increase_button_listener(lambda: self.increase())
         self.view.decrease_button_listener(lambda: self.decrease())
 
+    def render(self, line: CartLine) -> None:
+        self.view.set_item_name(line.get_name())
+        self.view.set_quantity(line.get_quantity())
+        self.view.set_price_label(line.get_price())
+
     def increase(self):
-        self.quantity += 1
-        self.view.set_quantity(self.quantity)
-        self.view.set_price_label(self.price * self.quantity)
-        self.parent.increase_total(self.price)
+        self.parent.change_quantity(self.key, 1)
 
     def decrease(self):
-        if self.quantity <= 0:
-            return
-        self.quantity -= 1
-        self.view.set_quantity(self.quantity)
-        self.view.set_price_label(self.price * self.quantity)
-        self.parent.decrease_total(self.price)
-        if self.quantity <= 0:
-            pass
-
-    def total_price(self) -> float:
-        return self.price * self.quantity
+        self.parent.change_quantity(self.key, -1)
 
 
 class LogPage(Controller):
@@ -308,16 +486,22 @@ class LogPage(Controller):
 
     def __init__(self, view: QWidget, model: Model):
         super().__init__(view, model)
-        self.initialize()
+        self.view.set_fetcher(self.fetch_logs)
 
     def initialize(self) -> None:
-        self.view.clear__scrollarea()
-        log_list: list[Log] = self.model.get_all_logs()
-        for log in log_list:
-            self.view.add_log_to_scrollarea(self.__create_log_widget(log))
+        self.view.set_loading(True)
+        self.model.load_all_logs(self.on_logs_loaded)
 
-    def __create_log_widget(self, log: Log) -> LogItem:
-        return LogItem(log.get_date(), log.get_time(), log.get_desc()[0:51])
+    def fetch_logs(self, last: Log, on_done) -> None:
+        "load the page after last in the background, on_done appends it to the list."
+        self.model.load_logs_before(
+            last, lambda logs: self.is_disposed() or on_done(logs))
+
+    def on_logs_loaded(self, log_list: list[Log]) -> None:
+        if self.is_disposed():
+            return
+        self.view.set_items(log_list)
+        self.view.set_loading(False)
 
 
 class ReceiptPage(Controller):
@@ -326,18 +510,22 @@ class ReceiptPage(Controller):
 
     def __init__(self, view: QWidget, model: Model):
         super().__init__(view, model)
-        self.initialize()
+        self.view.set_fetcher(self.fetch_receipts)
 
     def initialize(self) -> None:
-        self.view.clear__scrollarea()
-        receipt_list: list[Receipt] = self.model.get_all_receipt()
-        for receipt in receipt_list:
-            print(receipt)
-            self.view.add_receipt_to_scrollarea(
-                self.__create_receipt_widget(receipt))
+        self.view.set_loading(True)
+        self.model.load_all_receipt(self.on_receipts_loaded)
 
-    def __create_receipt_widget(self, receipt: Receipt) -> LogItem:
-        return LogItem(receipt.get_date(), receipt.get_time(), receipt.get_desc()[0:51])
+    def fetch_receipts(self, last: Receipt, on_done) -> None:
+        "load the page after last in the background, on_done appends it to the list."
+        self.model.load_receipts_before(
+            last, lambda receipts: self.is_disposed() or on_done(receipts))
+
+    def on_receipts_loaded(self, receipt_list: list[Receipt]) -> None:
+        if self.is_disposed():
+            return
+        self.view.set_items(receipt_list)
+        self.view.set_loading(False)
 
 
 # class AccountPage(Controller):
@@ -352,43 +540,81 @@ class MenuPage(Controller):
 
     def __init__(self, view: QWidget, model: Model):
         super().__init__(view, model)
+        self.__catalog_version = None
+        self.__filtered = False
         self.load_item()
         self.view.stacked_widget.addWidget(AdminEmptyView())
         self.view.set_add_button_listener(lambda: self.add_menu())
+        self.view.set_import_button_listener(lambda: self.import_menu())
+        self.view.set_item_click_listener(self.edit_menu)
+        self.view.set_search_listener(lambda text: self.show_products())
 
     def load_item(self) -> None:
-        self.view.clear__scrollarea()
-        item_list = self.model.get_all_products()
-        for item in item_list:
-            self.view.add_view_to_scrollarea(self.create_widget(item))
+        if self.__catalog_version == self.model.get_catalog_version():
+            return
+        self.show_products()
+        self.__catalog_version = self.model.get_catalog_version()
+
+    def show_products(self) -> None:
+        "list the products matching the search bar, or all of them when it is empty."
+        query = self.view.get_searched_item()
+        if query.strip() != "":
+            self.view.set_items(self.model.search(query))
+            self.__filtered = True
+        elif self.__filtered:
+            self.view.set_items(self.model.get_all_products())
+            self.__filtered = False
+        else:
+            self.view.reconcile_items(self.model.get_all_products())
+
+    def add_item(self, item: Drink | Bakery) -> None:
+        if self.__filtered:
+            self.show_products()
+        elif item.get_id() is not None:
+            self.view.insert_item(item)
+        self.__catalog_version = self.model.get_catalog_version()
+
+    def update_item(self, item: Drink | Bakery) -> None:
+        if self.__filtered:
+            self.show_products()
+        else:
+            self.view.update_item(item)
+        self.__catalog_version = self.model.get_catalog_version()
+
+    def remove_item(self, item: Drink | Bakery) -> None:
+        if self.__filtered:
+            self.show_products()
+        else:
+            self.view.remove_item(item)
+        self.__catalog_version = self.model.get_catalog_version()
 
-    def create_widget(self, item: Drink | Bakery) -> QWidget:
-        menu_item = MenuItem(self, item)
-        return menu_item.view
+    def edit_menu(self, item: Drink | Bakery) -> None:
+        menu_edit_form = MenuEdit(self, item)
+        self.view.stacked_widget.insertWidget(1, menu_edit_form.view)
+        self.view.stacked_widget.setCurrentIndex(1)
 
     def add_menu(self) -> None:
         menu_add = MenuAdd(self)
         self.view.stacked_widget.insertWidget(1, menu_add.view)
         self.view.stacked_widget.setCurrentIndex(1)
 
+    def import_menu(self) -> None:
+        path = self.view.ask_import_file()
+        if path == "":
+            return
+        self.view.set_import_enabled(False)
+        self.view.set_import_message("Importing...")
+        MenuImportModel().load_file(path, self.on_menu_imported)
 
-class MenuItem(Controller):
-    parent: MenuPage
-    view: AdminListItem
-
-    def __init__(self, parent: QWidget, item: Drink | Bakery):
-        super().__init__(AdminListItem(), None)
-        self.parent = parent
-        self.item = item
-
-        # initialize
-        self.view.set_itemname(self.item.get_name())
-        self.view.set_button_listener(lambda: self.on_click())
-
-    def on_click(self) -> None:
-        menu_edit_form = MenuEdit(self.parent, self.item)
-        self.parent.view.stacked_widget.insertWidget(1, menu_edit_form.view)
-        self.parent.view.stacked_widget.setCurrentIndex(1)
+    def on_menu_imported(self, report: MenuImport) -> None:
+        if self.is_disposed():
+            return
+        self.view.set_import_enabled(True)
+        if report is None:
+            self.view.set_import_message("Import failed, nothing was added.")
+            return
+        self.view.set_import_message(report.get_summary())
+        self.load_item()
 
 
 class MenuEdit(Controller):
@@ -427,16 +653,24 @@ class MenuEdit(Controller):
         price = self.view.get_price()
 
         if isinstance(self.item, Drink):
-            self.model.save(self.item, name, hprice, cprice, bprice)
+            saved = self.model.save(self.item, name, hprice, cprice, bprice)
         else:
-            self.model.save(self.item, name, price)
+            saved = self.model.save(self.item, name, price)
 
-        self.parent.load_item()
+        if saved is False:
+            self.view.show_error_label()
+            return
+        # deleted from another screen while it was being edited
+        if saved is None:
+            self.parent.remove_item(self.item)
+        else:
+            self.item = saved
+            self.parent.update_item(self.item)
         self.back_to_page()
 
     def delete(self) -> None:
         self.model.delete(self.item)
-        self.parent.load_item()
+        self.parent.remove_item(self.item)
         self.back_to_page()
 
     def cancel(self) -> None:
@@ -444,6 +678,7 @@ class MenuEdit(Controller):
 
     def back_to_page(self) -> None:
         self.parent.view.stacked_widget.removeWidget(self.view)
+        self.dispose()
         self.parent.view.stacked_widget.setCurrentIndex(0)
 
 
@@ -471,8 +706,10 @@ class MenuAdd(Controller):
             item = Drink(name, hprice, cprice, bprice)
         else:
             item = Bakery(name, price)
-        self.model.add(item)
-        self.parent.load_item()
+        if not self.model.add(item):
+            self.view.show_error_label()
+            return
+        self.parent.add_item(item)
         self.back_to_page()
 
     def cancel(self):
@@ -480,4 +717,5 @@ class MenuAdd(Controller):
 
     def back_to_page(self) -> None:
         self.parent.view.stacked_widget.removeWidget(self.view)
+        self.dispose()
         self.parent.view.stacked_widget.setCurrentIndex(0)
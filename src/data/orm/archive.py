@@ -0,0 +1,376 @@
+import gzip
+import io
+import json
+import os
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+from sqlalchemy import delete, func, select
+from sqlalchemy.engine import Engine
+from data.orm.schema import DB_PATH, Session, ArchivePart, Log, Receipt, OrderLine
+
+ARCHIVE_DIR = os.environ.get("NAAR_RAAN_ARCHIVE", os.path.join(
+    os.path.dirname(DB_PATH), "archive"))
+
+# days a row stays in the database before it is archived, per table
+RETENTION_POLICIES = {
+    Log.__tablename__: 90,
+    Receipt.__tablename__: 365
+}
+
+SCHEMAS = {
+    Log.__tablename__: Log,
+    Receipt.__tablename__: Receipt
+}
+
+
+def month_of(timestamp: int) -> str:
+    "return the YYYY-MM partition of epoch seconds (local time)."
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m")
+
+
+def load_row(table: str, row: dict):
+    "rebuild the Log or Receipt of an archived row."
+    return SCHEMAS[table](row["description"], row["id"], row["date"], row["time"], row["timestamp"])
+
+
+def load_line(row: dict) -> OrderLine:
+    line = OrderLine(row["item_type"], row["item_id"], row["name"],
+                     row["variant"], row["quantity"], row["price"], row["receipt_id"])
+    line.id = row["id"]
+    return line
+
+
+class ArchiveStore:
+    """
+    rows moved out of LOGS and RECEIPTS, one gzip compressed JSON Lines file per table
+    and month, receipts carry their order lines.\n
+    every batch is appended to its file as a new gzip member and only counts once the
+    ARCHIVES row with the new file size commits together with the delete from the
+    table, whatever a crash left after that size is cut off on the next start.
+    """
+    CACHE_SIZE = 4
+
+    def __init__(self, engine: Engine, directory: str = ARCHIVE_DIR):
+        self.__engine = engine
+        self.__directory = directory
+        self.__lock = threading.Lock()
+        self.__cache = OrderedDict()
+        self.__recover()
+
+    def move(self, table: str, cutoff: int, limit: int) -> tuple[int, float]:
+        """
+        archive up to limit rows of table older than cutoff (epoch seconds), oldest first.\n
+        return the number of rows moved and the seconds the write lock was held.
+        """
+        schema = SCHEMAS[table]
+        session = Session(bind=self.__engine, expire_on_commit=False)
+        written = list()
+        try:
+            rows = [dict(row._mapping) for row in session.execute(select(schema.__table__).where(
+                schema.timestamp < cutoff).order_by(schema.timestamp, schema.id).limit(limit))]
+            if len(rows) == 0:
+                return 0, 0.0
+            ids = [row["id"] for row in rows]
+
+            if schema is Receipt:
+                lines = {id: list() for id in ids}
+                for line in session.execute(select(OrderLine.__table__).where(
+                        OrderLine.receipt_id.in_(ids)).order_by(OrderLine.id)):
+                    lines[line.receipt_id].append(dict(line._mapping))
+                for row in rows:
+                    row["lines"] = lines[row["id"]]
+
+            months = dict()
+            for row in rows:
+                months.setdefault(month_of(row["timestamp"]), list()).append(row)
+
+            parts = list()
+            with session.no_autoflush:
+                for month, batch in months.items():
+                    part = session.query(ArchivePart).filter_by(
+                        table_name=table, month=month).first()
+                    if part is None:
+                        part = ArchivePart(
+                            table, month, f"{table}/{month}.jsonl.gz")
+                    written.append((part.get_path(), part.get_size()))
+                    self.__extend(part, batch)
+                    part.size += self.__append(part, batch)
+                    parts.append(part)
+
+            # the write lock is taken by the first delete and released by the commit
+            start = time.perf_counter()
+            if schema is Receipt:
+                session.execute(delete(OrderLine.__table__).where(
+                    OrderLine.receipt_id.in_(ids)))
+            session.execute(delete(schema.__table__).where(schema.id.in_(ids)))
+            session.add_all(parts)
+            session.commit()
+            return len(rows), time.perf_counter() - start
+        except Exception:
+            session.rollback()
+            for path, size in written:
+                self.__truncate(path, size)
+            raise
+        finally:
+            session.close()
+
+    def get_parts(self, table: str) -> list[ArchivePart]:
+        "return every archived month of table, oldest first."
+        session = Session(bind=self.__engine, expire_on_commit=False)
+        try:
+            parts = session.query(ArchivePart).filter_by(
+                table_name=table).order_by(ArchivePart.month).all()
+            session.expunge_all()
+            return parts
+        finally:
+            session.close()
+
+    def reaches(self, table: str, id: int = None, timestamp: int = None) -> bool:
+        "return True if table has archived rows with an id or timestamp of at least id or timestamp."
+        with self.__engine.connect() as connection:
+            last_id, last_timestamp = connection.execute(select(
+                func.max(ArchivePart.last_id), func.max(ArchivePart.last_timestamp)).where(
+                ArchivePart.table_name == table)).first()
+        if last_id is None:
+            return False
+        if id is not None:
+            return last_id >= id
+        if timestamp is not None:
+            return last_timestamp >= timestamp
+        return True
+
+    def page_before(self, table: str, id: int = None, n: int = 50) -> list:
+        "return up to n archived rows with an id below id (the newest when None), newest first."
+        rows = list()
+        for part in sorted(self.get_parts(table), key=lambda part: part.get_last_id(), reverse=True):
+            if id is not None and part.get_first_id() >= id:
+                continue
+            if len(rows) >= n and part.get_last_id() < rows[-1]["id"]:
+                break
+            rows.extend(row for row in self.__read(part)
+                        if id is None or row["id"] < id)
+            rows = sorted(rows, key=lambda row: row["id"], reverse=True)[:n]
+        return [load_row(table, row) for row in rows]
+
+    def page_after(self, table: str, id: int, n: int = 50) -> list:
+        "return up to n archived rows with an id above id, oldest first."
+        rows = list()
+        for part in sorted(self.get_parts(table), key=lambda part: part.get_first_id()):
+            if part.get_last_id() <= id:
+                continue
+            if len(rows) >= n and part.get_first_id() > rows[-1]["id"]:
+                break
+            rows.extend(row for row in self.__read(part) if row["id"] > id)
+            rows = sorted(rows, key=lambda row: row["id"])[:n]
+        return [load_row(table, row) for row in rows]
+
+    def page_between(self, table: str, start: int, end: int, last: tuple = None, n: int = 50) -> list:
+        """
+        return up to n archived rows with start <= timestamp < end, newest first.\n
+        last is the (timestamp, id) of the previous page's last row.
+        """
+        def key(row): return row["timestamp"], row["id"]
+        rows = list()
+        for part in sorted(self.get_parts(table), key=lambda part: part.get_last_timestamp(), reverse=True):
+            if part.get_last_timestamp() < start or part.get_first_timestamp() >= end:
+                continue
+            if len(rows) >= n and part.get_last_timestamp() < rows[-1]["timestamp"]:
+                break
+            rows.extend(row for row in self.__read(part) if start <= row["timestamp"] < end
+                        and (last is None or key(row) < last))
+            rows = sorted(rows, key=key, reverse=True)[:n]
+        return [load_row(table, row) for row in rows]
+
+    def count(self, table: str, start: int = None, end: int = None) -> int:
+        "return the archived rows of the months that overlap start <= timestamp < end."
+        return sum(part.get_rows() for part in self.get_parts(table)
+                   if self.__overlaps(part, start, end))
+
+    def stream(self, table: str, start: int = None, end: int = None) -> Iterator[dict]:
+        """
+        yield the archived rows of table with start <= timestamp < end as dicts, month by month.\n
+        only one month's compressed file is held in memory at a time.
+        """
+        for part in self.get_parts(table):
+            if not self.__overlaps(part, start, end):
+                continue
+            with open(os.path.join(self.__directory, part.get_path()), "rb") as file:
+                data = file.read(part.get_size())
+            with gzip.GzipFile(fileobj=io.BytesIO(data)) as lines:
+                for line in lines:
+                    row = json.loads(line)
+                    if (start is None or row["timestamp"] >= start) and (end is None or row["timestamp"] < end):
+                        yield row
+
+    def get_lines(self, receipt_id: int) -> list[OrderLine]:
+        "return the order lines of an archived receipt, empty if it is not archived."
+        for part in self.get_parts(Receipt.__tablename__):
+            if not part.get_first_id() <= receipt_id <= part.get_last_id():
+                continue
+            for row in self.__read(part):
+                if row["id"] == receipt_id:
+                    return [load_line(line) for line in row["lines"]]
+        return list()
+
+    def __extend(self, part: ArchivePart, rows: list[dict]) -> None:
+        "widen part's id and timestamp ranges to cover rows."
+        ids = [row["id"] for row in rows]
+        timestamps = [row["timestamp"] for row in rows]
+        if part.get_rows() > 0:
+            ids += [part.get_first_id(), part.get_last_id()]
+            timestamps += [part.get_first_timestamp(), part.get_last_timestamp()]
+        part.first_id, part.last_id = min(ids), max(ids)
+        part.first_timestamp, part.last_timestamp = min(timestamps), max(timestamps)
+        part.rows += len(rows)
+
+    def __overlaps(self, part: ArchivePart, start: int, end: int) -> bool:
+        return (start is None or part.get_last_timestamp() >= start) and (end is None or part.get_first_timestamp() < end)
+
+    def __append(self, part: ArchivePart, rows: list[dict]) -> int:
+        "write rows after the committed end of part's file, return the bytes written."
+        path = os.path.join(self.__directory, part.get_path())
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = gzip.compress("".join(json.dumps(row, ensure_ascii=False) + "\n"
+                                     for row in rows).encode("utf-8"))
+        with open(path, "r+b" if os.path.exists(path) else "wb") as file:
+            file.truncate(part.get_size())
+            file.seek(part.get_size())
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        return len(data)
+
+    def __read(self, part: ArchivePart) -> list[dict]:
+        "return the committed rows of part, the last CACHE_SIZE months read stay decoded."
+        with self.__lock:
+            cached = self.__cache.get(part.get_path())
+            if cached is not None and cached[0] == part.get_size():
+                self.__cache.move_to_end(part.get_path())
+                return cached[1]
+
+        with open(os.path.join(self.__directory, part.get_path()), "rb") as file:
+            data = file.read(part.get_size())
+        rows = [json.loads(line)
+                for line in gzip.decompress(data).decode("utf-8").splitlines()]
+
+        with self.__lock:
+            self.__cache[part.get_path()] = (part.get_size(), rows)
+            self.__cache.move_to_end(part.get_path())
+            while len(self.__cache) > ArchiveStore.CACHE_SIZE:
+                self.__cache.popitem(last=False)
+        return rows
+
+    def __truncate(self, path: str, size: int) -> None:
+        path = os.path.join(self.__directory, path)
+        if not os.path.exists(path):
+            return
+        if size == 0:
+            os.remove(path)
+            return
+        with open(path, "r+b") as file:
+            file.truncate(size)
+
+    def __recover(self) -> None:
+        "cut every file back to its committed size and drop files no ARCHIVES row knows."
+        if not os.path.isdir(self.__directory):
+            return
+        sizes = {part.get_path(): part.get_size()
+                 for table in SCHEMAS for part in self.get_parts(table)}
+        for table in SCHEMAS:
+            directory = os.path.join(self.__directory, table)
+            if not os.path.isdir(directory):
+                continue
+            for file_name in os.listdir(directory):
+                path = f"{table}/{file_name}"
+                if os.path.getsize(os.path.join(self.__directory, path)) != sizes.get(path, 0):
+                    self.__truncate(path, sizes.get(path, 0))
+
+
+class Retention:
+    """
+    move rows older than their table's policy into the archive on a background thread.\n
+    rows move in small batches, each in its own write transaction. the batch size
+    adapts so the write lock is held for about MAX_LOCK seconds, with a pause between
+    batches so the till and the log writer always get in.
+    """
+    MAX_LOCK = 0.005
+    BATCH_SIZE = 100
+    MIN_BATCH = 8
+    MAX_BATCH = 2000
+    PAUSE = 0.01
+    INTERVAL = 3600
+
+    def __init__(self, store: ArchiveStore, policies: dict = RETENTION_POLICIES, pause: float = PAUSE, interval: float = INTERVAL):
+        self.__store = store
+        self.__policies = policies
+        self.__pause = pause
+        self.__interval = interval
+        self.__batch = {table: Retention.BATCH_SIZE for table in policies}
+        self.__lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    def get_batch_size(self, table: str) -> int:
+        return self.__batch[table]
+
+    def step(self, table: str, now: float = None) -> int:
+        "archive one batch of table, return the number of rows moved."
+        now = time.time() if now is None else now
+        cutoff = int(now - self.__policies[table] * 24 * 60 * 60)
+        batch = self.__batch[table]
+        with self.__lock:
+            moved, held = self.__store.move(table, cutoff, batch)
+
+        if held > Retention.MAX_LOCK:
+            self.__batch[table] = max(Retention.MIN_BATCH, batch // 2)
+        elif moved == batch and held < Retention.MAX_LOCK / 2:
+            self.__batch[table] = min(Retention.MAX_BATCH, batch * 2)
+        return moved
+
+    def run_once(self, now: float = None) -> int:
+        "archive everything that is due, return the number of rows moved."
+        moved = 0
+        for table in self.__policies:
+            while not self.__stop.is_set():
+                count = self.step(table, now)
+                moved += count
+                if count == 0:
+                    break
+                self.__stop.wait(self.__pause)
+        return moved
+
+    @contextmanager
+    def paused(self):
+        "hold off archiving, e.g. while an export reads hot and archived rows."
+        with self.__lock:
+            yield
+
+    def start(self) -> None:
+        "run every INTERVAL seconds on a daemon thread until stop."
+        if self.__thread is not None:
+            return
+        self.__stop.clear()
+        self.__thread = threading.Thread(
+            target=self.__run, name="retention", daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        "stop after the batch in progress."
+        if self.__thread is None:
+            return
+        self.__stop.set()
+        self.__thread.join()
+        self.__thread = None
+
+    def __run(self) -> None:
+        while not self.__stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                traceback.print_exc()
+            self.__stop.wait(self.__interval)
@@ -1,7 +1,37 @@
+import atexit
 from abc import ABC, abstractmethod
-from sqlalchemy import desc
-from data.orm.schema import Session, engine
-from data.orm.schema import User, Drink, Bakery, Log, Receipt
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Lock
+from typing import Iterator
+from sqlalchemy import desc, func, insert, inspect, select, text, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import make_transient_to_detached, scoped_session, sessionmaker
+from data.orm.schema import Session, engine, SEARCH_TABLES
+from data.orm.archive import ArchiveStore, Retention
+from data.orm.schema import User, Drink, Bakery, Log, Receipt, OrderLine
+from data.orm.log_writer import LogWriter
+
+
+def match_query(query: str) -> str:
+    "turn what was typed into an FTS5 query, every word has to appear as a word prefix."
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def merge_newest(rows: list, archived: list, key, n: int) -> list:
+    "merge hot and archived rows newest first by key, a row caught mid-move counts once."
+    merged = {row.get_id(): row for row in archived}
+    merged.update((row.get_id(), row) for row in rows)
+    return sorted(merged.values(), key=key, reverse=True)[:n]
+
+
+def to_bounds(start: datetime, end: datetime) -> tuple[int, int]:
+    "epoch seconds of an optional date range."
+    return (None if start is None else int(start.timestamp()),
+            None if end is None else int(end.timestamp()))
 
 
 class DAO(ABC):
@@ -10,10 +40,211 @@ class DAO(ABC):
     def __init__(self, session: Session):
         self.session = session
 
+    def detach(self, rows: list) -> list:
+        "expunge read-only rows so the session does not keep them."
+        for row in rows:
+            self.session.expunge(row)
+        return rows
+
+    def insert_one(self, item, unique: str, update: bool = False) -> bool:
+        """
+        insert item in one statement, the unique column decides what a duplicate is.\n
+        on conflict the row is left alone, or overwritten when update is True.\n
+        return True and give item its id when a row was written.
+        """
+        row = item.get_row()
+        table = type(item).__table__
+        statement = sqlite_insert(table).values(row)
+        if update:
+            statement = statement.on_conflict_do_update(
+                index_elements=[unique],
+                set_={column: statement.excluded[column] for column in row})
+        else:
+            statement = statement.on_conflict_do_nothing(
+                index_elements=[unique])
+
+        written = self.session.execute(
+            statement.returning(table.c.id)).first()
+        self.session.commit()
+        if written is None:
+            return False
+
+        if inspect(item).transient:
+            item.id = written[0]
+            make_transient_to_detached(item)
+        return True
+
+    def insert_many(self, items: list, unique: str, update: bool = False, commit: bool = True) -> int:
+        """
+        insert items in one executemany, duplicates are skipped or overwritten as in insert_one.\n
+        with commit False the rows join the session's transaction and the caller commits.\n
+        return the number of rows written.
+        """
+        if len(items) == 0:
+            return 0
+
+        rows = [item.get_row() for item in items]
+        statement = sqlite_insert(type(items[0]).__table__)
+        if update:
+            statement = statement.on_conflict_do_update(
+                index_elements=[unique],
+                set_={column: statement.excluded[column] for column in rows[0]})
+        else:
+            statement = statement.on_conflict_do_nothing(
+                index_elements=[unique])
+
+        if not commit:
+            return self.session.execute(statement, rows).rowcount
+
+        try:
+            result = self.session.execute(statement, rows)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return result.rowcount
+
+    def full_text_search(self, schema, query: str, limit: int, cursor: tuple = None, ranked: bool = True) -> tuple[list, tuple]:
+        """
+        search the description of schema's table through its FTS5 index.\n
+        ranked orders by bm25 relevance, otherwise newest first (cheapest for words
+        that are in most rows). return the page and the cursor of the next page,
+        which is None after the last page.\n
+        bm25 scores move as rows are written, so ranked pages are read by offset over
+        the rows that existed when the first page was read, later rows only show up
+        in a new search. rows moved to the archive are not searched.
+        """
+        match = match_query(query)
+        if match == "":
+            return list(), None
+
+        fts = SEARCH_TABLES[schema.__tablename__]
+        where = f"{fts} MATCH :match"
+        params = {"match": match, "n": limit}
+        if ranked:
+            offset, last_id = cursor if cursor is not None else (0, self.session.execute(
+                text(f"SELECT max(rowid) FROM {fts}")).scalar() or 0)
+            where += " AND rowid <= :last"
+            params.update(last=last_id, offset=offset)
+            order = "rank, rowid LIMIT :n OFFSET :offset"
+        else:
+            if cursor is not None:
+                where += " AND rowid < :id"
+                params["id"] = cursor[1]
+            order = "rowid DESC LIMIT :n"
+
+        hits = [id for id, in self.session.execute(text(
+            f"SELECT rowid FROM {fts} WHERE {where} ORDER BY {order}"), params)]
+        rows = {row.id: row for row in self.session.query(schema).filter(
+            schema.id.in_(hits)).all()}
+        results = self.detach([rows[id] for id in hits if id in rows])
+        if len(hits) < limit:
+            return results, None
+        if ranked:
+            return results, (offset + limit, last_id)
+        return results, (None, hits[-1])
+
+    def count_rows(self, schema, start: int = None, end: int = None) -> int:
+        "return the rows of schema's table with start <= timestamp < end."
+        query = select(func.count()).select_from(schema.__table__)
+        if start is not None:
+            query = query.where(schema.timestamp >= start)
+        if end is not None:
+            query = query.where(schema.timestamp < end)
+        return self.session.execute(query).scalar()
+
+    def stream_rows(self, schema, start: int = None, end: int = None, batch_size: int = 1000) -> Iterator[list[dict]]:
+        """
+        yield the rows of schema's table with start <= timestamp < end as batches of dicts,
+        oldest first. every batch is its own keyset query, nothing is kept between them.
+        """
+        last = None
+        while True:
+            query = select(schema.__table__)
+            if start is not None:
+                query = query.where(schema.timestamp >= start)
+            if end is not None:
+                query = query.where(schema.timestamp < end)
+            if last is not None:
+                query = query.where(
+                    tuple_(schema.timestamp, schema.id) > tuple_(*last))
+            rows = [dict(row) for row in self.session.execute(query.order_by(
+                schema.timestamp, schema.id).limit(batch_size)).mappings()]
+            if len(rows) == 0:
+                return
+            yield rows
+            last = rows[-1]["timestamp"], rows[-1]["id"]
+
+    def commit_update(self) -> bool:
+        "commit an update, return False when it would break a unique column."
+        try:
+            self.session.commit()
+        except IntegrityError:
+            self.session.rollback()
+            return False
+        return True
+
 
 class AppDAO:
 
-    local_session = Session(bind=engine)
+    # one session per thread, objects keep their values after commit
+    local_session = scoped_session(sessionmaker(
+        bind=engine, expire_on_commit=False))
+    log_writer: LogWriter = None
+    archive: ArchiveStore = None
+    retention: Retention = None
+
+    @staticmethod
+    def get_log_writer() -> LogWriter:
+        "return the shared background log writer, started on first use."
+        if AppDAO.log_writer is None:
+            AppDAO.log_writer = LogWriter(engine)
+            atexit.register(AppDAO.shutdown)
+        return AppDAO.log_writer
+
+    @staticmethod
+    def get_archive() -> ArchiveStore:
+        "return the shared archive of old logs and receipts."
+        if AppDAO.archive is None:
+            AppDAO.archive = ArchiveStore(engine)
+        return AppDAO.archive
+
+    @staticmethod
+    def get_retention() -> Retention:
+        "return the retention job that moves old rows into the archive, call start() to run it."
+        if AppDAO.retention is None:
+            AppDAO.retention = Retention(AppDAO.get_archive())
+        return AppDAO.retention
+
+    @staticmethod
+    @contextmanager
+    def unit_of_work():
+        """
+        yield the calling thread's session for one unit of work.\n
+        commit on success, rollback on error, then drop the session with its identity map.
+        """
+        session = AppDAO.local_session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            AppDAO.local_session.remove()
+
+    @staticmethod
+    def release() -> None:
+        "close the calling thread's session, e.g. on logout, a new one starts on next use."
+        AppDAO.local_session.remove()
+
+    @staticmethod
+    def shutdown() -> None:
+        "stop archiving and write everything still queued, call before the application exits."
+        if AppDAO.retention is not None:
+            AppDAO.retention.stop()
+        if AppDAO.log_writer is not None:
+            AppDAO.log_writer.close()
 
     @staticmethod
     def get_dao(type: str) -> DAO:
@@ -25,32 +256,90 @@ class AppDAO:
         log -> LogDAO\n
         receipt -> ReceiptDAO
         """
+        return AppDAO.create_dao(type, AppDAO.local_session)
+
+    @staticmethod
+    def create_dao(type: str, session: Session) -> DAO:
+        "return the data access object of type bound to session."
         if type == "user":
-            return UserDAO(AppDAO.local_session)
+            return UserDAO(session)
         elif type == "drink":
-            return DrinkDAO(AppDAO.local_session)
+            return DrinkDAO(session)
         elif type == "bakery":
-            return BakeryDAO(AppDAO.local_session)
+            return BakeryDAO(session)
         elif type == "log":
-            return LogDAO(AppDAO.local_session)
+            return LogDAO(session, AppDAO.get_log_writer(), AppDAO.get_archive())
         elif type == "receipt":
-            return ReceiptDAO(AppDAO.local_session)
+            return ReceiptDAO(session, AppDAO.get_archive())
 
         else:
             return None
 
 
+class UserCache:
+    """
+    small cache of staff records by username, shared by every thread.\n
+    entries are detached copies, so handing one out never touches a session.
+    UserDAO drops an entry whenever that user is written.
+    """
+    CAPACITY = 32
+    __users: OrderedDict = OrderedDict()
+    __lock = Lock()
+
+    @staticmethod
+    def get(username: str) -> User:
+        "return the cached user or None."
+        with UserCache.__lock:
+            user = UserCache.__users.get(username)
+            if user is not None:
+                UserCache.__users.move_to_end(username)
+            return user
+
+    @staticmethod
+    def put(user: User) -> None:
+        "cache a copy of user, the least recently used entry goes when full."
+        copy = User(user.get_fname(), user.get_lname(), user.get_username(),
+                    user.get_password(), user.get_access_level())
+        copy.id = user.get_id()
+        make_transient_to_detached(copy)
+        with UserCache.__lock:
+            UserCache.__users[copy.get_username()] = copy
+            UserCache.__users.move_to_end(copy.get_username())
+            while len(UserCache.__users) > UserCache.CAPACITY:
+                UserCache.__users.popitem(last=False)
+
+    @staticmethod
+    def invalidate(username: str = None) -> None:
+        "drop username, or every entry when username is None."
+        with UserCache.__lock:
+            if username is None:
+                UserCache.__users.clear()
+            else:
+                UserCache.__users.pop(username, None)
+
+
 class UserDAO(DAO):
 
     def __init__(self, session: Session):
         super().__init__(session)
 
-    def add_user(self, user: User) -> None:
-        if user is None or self.__exist(user):
-            return
+    def add_user(self, user: User) -> bool:
+        "add user unless the username is taken, return True if it was added."
+        if user is None:
+            return False
+        return self.insert_one(user, "username")
 
-        self.session.add(user)
-        self.session.commit()
+    def add_users(self, users: list[User]) -> int:
+        "add users in one statement skipping taken usernames, return the number added."
+        return self.insert_many(users, "username")
+
+    def upsert_user(self, user: User) -> bool:
+        "add user, or overwrite the account that has the same username."
+        if user is None:
+            return False
+        written = self.insert_one(user, "username", update=True)
+        UserCache.invalidate(user.get_username())
+        return written
 
     def get_all_users(self) -> list[User]:
         return self.session.query(User).all()
@@ -59,7 +348,16 @@ class UserDAO(DAO):
         return self.session.query(User).filter(User.id == id).first()
 
     def get_user_by_username(self, username: str) -> User:
-        return self.session.query(User).filter(User.username == username).first()
+        "return the user from the cache, or look it up on the username index."
+        user = UserCache.get(username)
+        if user is not None:
+            return user
+
+        user = self.session.query(User).filter(
+            User.username == username).first()
+        if user is not None:
+            UserCache.put(user)
+        return user
 
     def delete_user_by_id(self, id: int):
         user: User = self.session.query(User).filter(User.id == id).first()
@@ -68,6 +366,7 @@ class UserDAO(DAO):
 
         self.session.delete(user)
         self.session.commit()
+        UserCache.invalidate(user.get_username())
 
     def update_user(
             self,
@@ -83,6 +382,7 @@ class UserDAO(DAO):
         if user is None:
             return False
 
+        cached_username = user.get_username()
         if fname is not None:
             user.fname = fname
 
@@ -98,22 +398,9 @@ class UserDAO(DAO):
         if access_level is not None:
             user.access_level = access_level
 
-        self.session.commit()
-        return True
-
-    def __exist(self, user: User) -> bool:
-        "return True if User __exist in the database."
-        if user is None:
-            return False
-
-        query = self.session.query(User).filter(
-            User.fname == user.get_fname(),
-            User.lname == user.get_lname(),
-            User.username == user.get_username(),
-            User.password == user.get_password(),
-            User.access_level == user.get_access_level()
-        ).first()
-        return query is not None
+        saved = self.commit_update()
+        UserCache.invalidate(cached_username)
+        return saved
 
 
 class DrinkDAO(DAO):
@@ -121,12 +408,25 @@ class DrinkDAO(DAO):
     def __init__(self, session: Session):
         super().__init__(session)
 
-    def add_drink(self, drink: Drink) -> None:
-        if drink is None or self.__exist(drink):
-            return
+    def add_drink(self, drink: Drink) -> bool:
+        "add drink unless the name is taken, return True if it was added."
+        if drink is None:
+            return False
+        return self.insert_one(drink, "name")
 
-        self.session.add(drink)
-        self.session.commit()
+    def add_drinks(self, drinks: list[Drink]) -> int:
+        "add drinks in one statement skipping taken names, return the number added."
+        return self.insert_many(drinks, "name")
+
+    def get_names(self) -> set[str]:
+        "return the name of every drink."
+        return set(self.session.scalars(select(Drink.name)))
+
+    def upsert_drink(self, drink: Drink) -> bool:
+        "add drink, or overwrite the prices of the drink with the same name."
+        if drink is None:
+            return False
+        return self.insert_one(drink, "name", update=True)
 
     def get_all_drinks(self) -> list[Drink]:
         return self.session.query(Drink).all()
@@ -166,20 +466,7 @@ class DrinkDAO(DAO):
 
         if bprice is not None:
             drink.bprice = bprice
-        self.session.commit()
-        return True
-
-    def __exist(self, drink: Drink) -> bool:
-        if drink is None:
-            return False
-
-        query = self.session.query(Drink).filter(
-            Drink.name == drink.get_name(),
-            Drink.hprice == drink.get_hprice(),
-            Drink.cprice == drink.get_cprice(),
-            Drink.bprice == drink.get_bprice()
-        ).first()
-        return query is not None
+        return self.commit_update()
 
 
 class BakeryDAO(DAO):
@@ -187,12 +474,25 @@ class BakeryDAO(DAO):
     def __init__(self, session: Session):
         self.session = session
 
-    def add_bakery(self, bakery: Bakery) -> None:
-        if bakery is None or self.__exist(bakery):
-            return
+    def add_bakery(self, bakery: Bakery) -> bool:
+        "add bakery unless the name is taken, return True if it was added."
+        if bakery is None:
+            return False
+        return self.insert_one(bakery, "name")
 
-        self.session.add(bakery)
-        self.session.commit()
+    def add_bakeries(self, bakeries: list[Bakery]) -> int:
+        "add bakeries in one statement skipping taken names, return the number added."
+        return self.insert_many(bakeries, "name")
+
+    def get_names(self) -> set[str]:
+        "return the name of every bakery."
+        return set(self.session.scalars(select(Bakery.name)))
+
+    def upsert_bakery(self, bakery: Bakery) -> bool:
+        "add bakery, or overwrite the price of the bakery with the same name."
+        if bakery is None:
+            return False
+        return self.insert_one(bakery, "name", update=True)
 
     def get_all_bakeries(self) -> list[Bakery]:
         return self.session.query(Bakery).all()
@@ -221,47 +521,123 @@ class BakeryDAO(DAO):
             return False
 
         if name is not None:
-            bakery.name == name
+            bakery.name = name
 
         if price is not None:
-            bakery.price == price
-
-        self.session.commit()
-        return True
-
-    def __exist(self, bakery: Bakery) -> bool:
-        if bakery is None:
-            return None
+            bakery.price = price
 
-        query = self.session.query(Bakery).filter(
-            Bakery.name == bakery.get_name(),
-            Bakery.price == bakery.get_price()
-        ).first()
-        return query is not None
+        return self.commit_update()
 
 
 class LogDAO(DAO):
     LOG_LIMIT = 50
+    EXPORT_BATCH = 1000
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, writer: LogWriter = None, archive: ArchiveStore = None):
         super().__init__(session)
+        self.writer = writer
+        self.archive = archive
 
     def add_log(self, log: Log) -> None:
+        "queue log on the writer when there is one, otherwise commit it now."
         if log is None:
             return
 
+        if self.writer is not None:
+            self.writer.put(log)
+            return
+
         self.session.add(log)
         self.session.commit()
 
+    def flush(self) -> None:
+        "make queued logs visible to the queries below."
+        if self.writer is not None:
+            self.writer.flush()
+
     def get_all_logs(self) -> list[Log]:
-        return self.session.query(Log).order_by(desc(Log.id)).limit(LogDAO.LOG_LIMIT).all()
+        self.flush()
+        return self.page_before(None, LogDAO.LOG_LIMIT)
+
+    def page_before(self, id: int = None, n: int = LOG_LIMIT) -> list[Log]:
+        """
+        return up to n logs older than id, newest first.\n
+        start from the newest log when id is None.
+        """
+        query = self.session.query(Log)
+        if id is not None:
+            query = query.filter(Log.id < id)
+        logs = self.detach(query.order_by(desc(Log.id)).limit(n).all())
+        if self.archive is not None and (len(logs) < n or self.archive.reaches(Log.__tablename__, id=logs[-1].get_id())):
+            logs = merge_newest(logs, self.archive.page_before(
+                Log.__tablename__, id, n), lambda log: log.get_id(), n)
+        return logs
+
+    def page_after(self, id: int, n: int = LOG_LIMIT) -> list[Log]:
+        "return up to n logs newer than id, newest first."
+        logs = self.detach(self.session.query(Log).filter(
+            Log.id > id).order_by(Log.id).limit(n).all())
+        if self.archive is not None and self.archive.reaches(Log.__tablename__, id=id + 1):
+            logs = merge_newest(logs, self.archive.page_after(
+                Log.__tablename__, id, n), lambda log: -log.get_id(), n)
+        logs.reverse()
+        return logs
+
+    def page_between(self, start: datetime, end: datetime, last: Log = None, n: int = LOG_LIMIT) -> list[Log]:
+        """
+        return up to n logs with start <= time < end, newest first.\n
+        pass the last log of the previous page as last to continue.
+        """
+        query = self.session.query(Log).filter(
+            Log.timestamp >= int(start.timestamp()), Log.timestamp < int(end.timestamp()))
+        if last is not None:
+            query = query.filter(tuple_(Log.timestamp, Log.id) <
+                                 tuple_(last.get_timestamp(), last.get_id()))
+        logs = self.detach(query.order_by(
+            desc(Log.timestamp), desc(Log.id)).limit(n).all())
+        if self.archive is not None and (len(logs) < n or self.archive.reaches(Log.__tablename__, timestamp=logs[-1].get_timestamp())):
+            logs = merge_newest(logs, self.archive.page_between(Log.__tablename__, int(start.timestamp()), int(end.timestamp()),
+                                None if last is None else (last.get_timestamp(), last.get_id()), n),
+                                lambda log: (log.get_timestamp(), log.get_id()), n)
+        return logs
+
+    def count(self, start: datetime = None, end: datetime = None) -> int:
+        "return about how many logs stream(start, end) yields, archived months are counted whole."
+        self.flush()
+        start, end = to_bounds(start, end)
+        archived = 0 if self.archive is None else self.archive.count(
+            Log.__tablename__, start, end)
+        return archived + self.count_rows(Log, start, end)
+
+    def stream(self, start: datetime = None, end: datetime = None, batch_size: int = EXPORT_BATCH) -> Iterator[dict]:
+        """
+        yield every log with start <= time < end as a column -> value dict, archived
+        logs first, then the database oldest first, batch_size rows at a time.
+        """
+        self.flush()
+        start, end = to_bounds(start, end)
+        if self.archive is not None:
+            yield from self.archive.stream(Log.__tablename__, start, end)
+        for rows in self.stream_rows(Log, start, end, batch_size):
+            yield from rows
+
+    def search(self, query: str, limit: int = LOG_LIMIT, cursor: tuple = None, ranked: bool = True) -> tuple[list[Log], tuple]:
+        """
+        full-text search over log descriptions, e.g. search("Latte").\n
+        return (logs, cursor), pass cursor back to get the next page.
+        archived logs are not searched.
+        """
+        self.flush()
+        return self.full_text_search(Log, query, limit, cursor, ranked)
 
 
 class ReceiptDAO(DAO):
     RECEIPT_LIMIT = 100
+    EXPORT_BATCH = 1000
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, archive: ArchiveStore = None):
         super().__init__(session)
+        self.archive = archive
 
     def add_receipt(self, receipt: Receipt) -> None:
         if receipt is None:
@@ -270,5 +646,108 @@ class ReceiptDAO(DAO):
         self.session.add(receipt)
         self.session.commit()
 
+    def add_receipt_with_lines(self, receipt: Receipt, lines: list[OrderLine]) -> None:
+        """
+        write receipt and all of its lines in one transaction.\n
+        lines are inserted with a single executemany.
+        """
+        if receipt is None:
+            return
+
+        try:
+            self.session.add(receipt)
+            self.session.flush()
+            rows = list()
+            for line in lines:
+                line.receipt_id = receipt.id
+                rows.append(line.get_row())
+            if len(rows) > 0:
+                self.session.execute(insert(OrderLine.__table__), rows)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def get_lines(self, receipt_id: int) -> list[OrderLine]:
+        lines = self.detach(self.session.query(OrderLine).filter(
+            OrderLine.receipt_id == receipt_id).order_by(OrderLine.id).all())
+        if len(lines) == 0 and self.archive is not None:
+            lines = self.archive.get_lines(receipt_id)
+        return lines
+
     def get_all_receipts(self) -> list[Receipt]:
-        return self.session.query(Receipt).order_by(desc(Receipt.id)).limit(ReceiptDAO.RECEIPT_LIMIT).all()
+        return self.page_before(None, ReceiptDAO.RECEIPT_LIMIT)
+
+    def page_before(self, id: int = None, n: int = RECEIPT_LIMIT) -> list[Receipt]:
+        """
+        return up to n receipts older than id, newest first.\n
+        start from the newest receipt when id is None.
+        """
+        query = self.session.query(Receipt)
+        if id is not None:
+            query = query.filter(Receipt.id < id)
+        receipts = self.detach(query.order_by(desc(Receipt.id)).limit(n).all())
+        if self.archive is not None and (len(receipts) < n or self.archive.reaches(Receipt.__tablename__, id=receipts[-1].get_id())):
+            receipts = merge_newest(receipts, self.archive.page_before(
+                Receipt.__tablename__, id, n), lambda receipt: receipt.get_id(), n)
+        return receipts
+
+    def page_after(self, id: int, n: int = RECEIPT_LIMIT) -> list[Receipt]:
+        "return up to n receipts newer than id, newest first."
+        receipts = self.detach(self.session.query(Receipt).filter(
+            Receipt.id > id).order_by(Receipt.id).limit(n).all())
+        if self.archive is not None and self.archive.reaches(Receipt.__tablename__, id=id + 1):
+            receipts = merge_newest(receipts, self.archive.page_after(
+                Receipt.__tablename__, id, n), lambda receipt: -receipt.get_id(), n)
+        receipts.reverse()
+        return receipts
+
+    def page_between(self, start: datetime, end: datetime, last: Receipt = None, n: int = RECEIPT_LIMIT) -> list[Receipt]:
+        """
+        return up to n receipts with start <= time < end, newest first.\n
+        pass the last receipt of the previous page as last to continue.
+        """
+        query = self.session.query(Receipt).filter(
+            Receipt.timestamp >= int(start.timestamp()), Receipt.timestamp < int(end.timestamp()))
+        if last is not None:
+            query = query.filter(tuple_(Receipt.timestamp, Receipt.id) <
+                                 tuple_(last.get_timestamp(), last.get_id()))
+        receipts = self.detach(query.order_by(
+            desc(Receipt.timestamp), desc(Receipt.id)).limit(n).all())
+        if self.archive is not None and (len(receipts) < n or self.archive.reaches(Receipt.__tablename__, timestamp=receipts[-1].get_timestamp())):
+            receipts = merge_newest(receipts, self.archive.page_between(Receipt.__tablename__, int(start.timestamp()), int(end.timestamp()),
+                                None if last is None else (last.get_timestamp(), last.get_id()), n),
+                                lambda receipt: (receipt.get_timestamp(), receipt.get_id()), n)
+        return receipts
+
+    def count(self, start: datetime = None, end: datetime = None) -> int:
+        "return about how many receipts stream(start, end) yields, archived months are counted whole."
+        start, end = to_bounds(start, end)
+        archived = 0 if self.archive is None else self.archive.count(
+            Receipt.__tablename__, start, end)
+        return archived + self.count_rows(Receipt, start, end)
+
+    def stream(self, start: datetime = None, end: datetime = None, batch_size: int = EXPORT_BATCH) -> Iterator[dict]:
+        """
+        yield every receipt with start <= time < end as a column -> value dict with its
+        order lines under "lines", archived receipts first, then the database oldest first.
+        """
+        start, end = to_bounds(start, end)
+        if self.archive is not None:
+            yield from self.archive.stream(Receipt.__tablename__, start, end)
+        for rows in self.stream_rows(Receipt, start, end, batch_size):
+            lines = {row["id"]: list() for row in rows}
+            for line in self.session.execute(select(OrderLine.__table__).where(
+                    OrderLine.receipt_id.in_(list(lines))).order_by(OrderLine.id)).mappings():
+                lines[line["receipt_id"]].append(dict(line))
+            for row in rows:
+                row["lines"] = lines[row["id"]]
+                yield row
+
+    def search(self, query: str, limit: int = RECEIPT_LIMIT, cursor: tuple = None, ranked: bool = True) -> tuple[list[Receipt], tuple]:
+        """
+        full-text search over receipt descriptions.\n
+        return (receipts, cursor), pass cursor back to get the next page.
+        archived receipts are not searched.
+        """
+        return self.full_text_search(Receipt, query, limit, cursor, ranked)
@@ -0,0 +1,132 @@
+import queue
+import sys
+import threading
+import time
+import traceback
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from data.orm.schema import Session, Log
+
+
+class LogWriter:
+    """
+    write audit logs on a background thread with group commit.\n
+    logs are queued and committed in one transaction per batch, a batch is written
+    when it reaches BATCH_SIZE or FLUSH_INTERVAL seconds after its first log.
+    a failed write is retried RETRIES times with a doubling delay, after that the
+    batch is kept for the next one and the error is raised by flush() and close().
+    at most queue_size failed logs are kept, the oldest are dropped with a warning.
+    """
+    BATCH_SIZE = 64
+    FLUSH_INTERVAL = 0.5
+    QUEUE_SIZE = 10000
+    RETRIES = 4
+    RETRY_DELAY = 0.05
+
+    def __init__(self, engine: Engine, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL, queue_size: int = QUEUE_SIZE):
+        self.__session = Session(bind=engine)
+        self.__batch_size = batch_size
+        self.__flush_interval = flush_interval
+        self.__queue = queue.Queue(queue_size)
+        self.__pending_size = queue_size
+        # put() checks and enqueues under the lock close() queues the stop under
+        self.__lock = threading.Lock()
+        self.__closed = False
+        # error of the last write, None once a write succeeds
+        self.__error: Exception = None
+        self.__thread = threading.Thread(
+            target=self.__run, name="log-writer", daemon=True)
+        self.__thread.start()
+
+    def put(self, log: Log) -> None:
+        "queue log, blocks only when the queue is full."
+        with self.__lock:
+            if self.__closed:
+                raise RuntimeError("log writer is closed")
+            self.__queue.put(log)
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        block until every log queued so far is committed, return False on timeout.\n
+        raise the write error when those logs could not be committed.
+        """
+        done = threading.Event()
+        done.error = None
+        with self.__lock:
+            if self.__closed:
+                return True
+            self.__queue.put(done)
+        if not done.wait(timeout):
+            return False
+        if done.error is not None:
+            raise done.error
+        return True
+
+    def close(self) -> None:
+        "write everything still queued and stop the thread, raise the error if that failed."
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__queue.put(None)
+        self.__thread.join()
+        self.__session.close()
+        if self.__error is not None:
+            raise self.__error
+
+    def __run(self) -> None:
+        stop = False
+        # logs whose write failed, written again ahead of the next batch
+        pending = list()
+        while not stop:
+            batch = list()
+            waiters = list()
+            item = self.__queue.get()
+            deadline = time.monotonic() + self.__flush_interval
+
+            while True:
+                if item is None:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self.__batch_size:
+                    break
+                try:
+                    item = self.__queue.get(
+                        timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+
+            batch = pending + batch
+            self.__error = self.__write(batch)
+            pending = batch if self.__error is not None else list()
+            if len(pending) > self.__pending_size:
+                dropped = len(pending) - self.__pending_size
+                pending = pending[dropped:]
+                print(f"log writer: dropped {dropped} logs that could not be written",
+                      file=sys.stderr)
+            for waiter in waiters:
+                waiter.error = self.__error
+                waiter.set()
+
+    def __write(self, batch: list[Log]) -> Exception:
+        "commit batch, retrying with backoff, return the last error or None."
+        if len(batch) == 0:
+            return None
+        delay = self.RETRY_DELAY
+        for attempt in range(self.RETRIES + 1):
+            try:
+                self.__session.execute(insert(Log.__table__), [
+                                       log.get_row() for log in batch])
+                self.__session.commit()
+                return None
+            except Exception as error:
+                self.__session.rollback()
+                if attempt == self.RETRIES:
+                    traceback.print_exc()
+                    return error
+                time.sleep(delay)
+                delay *= 2
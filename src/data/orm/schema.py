@@ -1,22 +1,81 @@
 import os
+import sys
 from datetime import datetime
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy import Column, String, Integer, Boolean, Float, create_engine
+from sqlalchemy import Column, String, Integer, Boolean, Float, ForeignKey, create_engine, event, inspect, text
+from sqlalchemy.engine import Engine
+
+# connection pragmas per deployment, pick one with NAAR_RAAN_DB_PROFILE
+ENGINE_PROFILES = {
+    # every commit reaches the disk before it returns
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000
+    },
+    # WAL + NORMAL can lose the last commits on power loss but never corrupts
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000
+    },
+    # no fsync at all, for demos and benchmarks only
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000
+    }
+}
+DEFAULT_PROFILE = "balanced"
+
+
+def create_profile_engine(url: str, profile: str = DEFAULT_PROFILE) -> Engine:
+    "create an engine that applies the pragmas of profile on every new connection."
+    pragmas = ENGINE_PROFILES[profile]
+    new_engine = create_engine(url)
+
+    @event.listens_for(new_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return new_engine
+
 
 # set up database and connection
 BASE_DIR = os.path.dirname(os.path.realpath(__file__))
-connection = "sqlite:///" + os.path.join(BASE_DIR, "data.db")
+DB_PATH = os.environ.get("NAAR_RAAN_DB", os.path.join(BASE_DIR, "data.db"))
+DB_PROFILE = os.environ.get("NAAR_RAAN_DB_PROFILE", DEFAULT_PROFILE)
+connection = "sqlite:///" + DB_PATH
 Schema = declarative_base()
-engine = create_engine(connection)
+engine = create_profile_engine(connection, DB_PROFILE)
 Session = sessionmaker()
 
+DATETIME_FORMAT = "%d-%m-%Y %H:%M"
+
+
+def to_timestamp(date: str, time: str) -> int:
+    "convert DD-MM-YYYY and HH:MM strings to epoch seconds (local time)."
+    return int(datetime.strptime(f"{date} {time}", DATETIME_FORMAT).timestamp())
+
 
 class User(Schema):
     __tablename__ = "USERS"
     id = Column("id", Integer(), primary_key=True)
     fname = Column("first_name", String(255))
     lname = Column("last_name", String(255))
-    username = Column("username", String(255))
+    username = Column("username", String(255), unique=True, index=True)
     password = Column("password", String(255))
     access_level = Column("access_level", String(5))
 
@@ -55,11 +114,21 @@ class User(Schema):
         "return user's access level."
         return self.access_level
 
+    def get_row(self) -> dict:
+        "return the user as a column -> value dict for bulk insert."
+        return {
+            "first_name": self.fname,
+            "last_name": self.lname,
+            "username": self.username,
+            "password": self.password,
+            "access_level": self.access_level
+        }
+
 
 class Drink(Schema):
     __tablename__ = "DRINKS"
     id = Column("id", Integer(), primary_key=True)
-    name = Column("name", String(255))
+    name = Column("name", String(255), unique=True, index=True)
     hprice = Column("hprice", Float())
     cprice = Column("cprice", Float())
     bprice = Column("bprice", Float())
@@ -96,11 +165,20 @@ class Drink(Schema):
     def get_price(self) -> str:
         return f"H{self.hprice} / C{self.cprice} / B{self.bprice}"
 
+    def get_row(self) -> dict:
+        "return the drink as a column -> value dict for bulk insert."
+        return {
+            "name": self.name,
+            "hprice": self.hprice,
+            "cprice": self.cprice,
+            "bprice": self.bprice
+        }
+
 
 class Bakery(Schema):
     __tablename__ = "BAKERIES"
     id = Column("id", Integer(), primary_key=True)
-    name = Column("name", String(255))
+    name = Column("name", String(255), unique=True, index=True)
     price = Column("price", Float())
 
     def __init__(self, name: str, price: float):
@@ -120,25 +198,37 @@ class Bakery(Schema):
     def get_price(self) -> float:
         return self.price
 
+    def get_row(self) -> dict:
+        "return the bakery as a column -> value dict for bulk insert."
+        return {
+            "name": self.name,
+            "price": self.price
+        }
+
 
 class Log(Schema):
     __tablename__ = "LOGS"
     id = Column("id", Integer(), primary_key=True)
     date = Column("date", String(30))
     time = Column("time", String(30))
+    timestamp = Column("timestamp", Integer(), index=True)
     desc = Column("description", String(1000))
 
-    def __init__(self, desc: str, id: int = None, date: str = None, time: str = None):
+    def __init__(self, desc: str, id: int = None, date: str = None, time: str = None, timestamp: int = None):
         super().__init__()
         self.id = id
         self.date = date
         self.time = time
+        self.timestamp = timestamp
         self.desc = desc
 
         if None in [self.date, self.time]:
             now = datetime.now()
             self.date = f"{now.day:02d}-{now.month:02d}-{now.year}"
             self.time = f"{now.hour:02d}:{now.minute:02d}"
+            self.timestamp = int(now.timestamp())
+        elif self.timestamp is None:
+            self.timestamp = to_timestamp(self.date, self.time)
 
     def __str__(self):
         return f"<Log date={self.date} time={self.time} description={self.desc}>"
@@ -152,31 +242,49 @@ class Log(Schema):
     def get_time(self) -> str:
         return self.time
 
+    def get_timestamp(self) -> int:
+        "return epoch seconds."
+        return self.timestamp
+
     def get_desc(self) -> str:
         return self.desc
 
     def get_detail(self) -> tuple:
         return self.date, self.time, self.desc
 
+    def get_row(self) -> dict:
+        "return the log as a column -> value dict for bulk insert."
+        return {
+            "date": self.date,
+            "time": self.time,
+            "timestamp": self.timestamp,
+            "description": self.desc
+        }
+
 
 class Receipt(Schema):
     __tablename__ = "RECEIPTS"
     id = Column("id", Integer(), primary_key=True)
     date = Column("date", String(30))
     time = Column("time", String(30))
+    timestamp = Column("timestamp", Integer(), index=True)
     desc = Column("description", String(1000))
 
-    def __init__(self, desc: str, id: int = None, date: str = None, time: str = None):
+    def __init__(self, desc: str, id: int = None, date: str = None, time: str = None, timestamp: int = None):
         super().__init__()
         self.id = id
         self.date = date
         self.time = time
+        self.timestamp = timestamp
         self.desc = desc
 
         if None in [self.date, self.time]:
             now = datetime.now()
             self.date = f"{now.day:02d}-{now.month:02d}-{now.year}"
             self.time = f"{now.hour:02d}:{now.minute:02d}"
+            self.timestamp = int(now.timestamp())
+        elif self.timestamp is None:
+            self.timestamp = to_timestamp(self.date, self.time)
 
     def __str__(self) -> str:
         return f"<Receipt date={self.date} time={self.time} description={self.desc}>"
@@ -190,5 +298,288 @@ class Receipt(Schema):
     def get_time(self) -> str:
         return self.time
 
+    def get_timestamp(self) -> int:
+        "return epoch seconds."
+        return self.timestamp
+
     def get_desc(self) -> str:
         return self.desc
+
+
+class OrderLine(Schema):
+    __tablename__ = "ORDER_LINES"
+    id = Column("id", Integer(), primary_key=True)
+    receipt_id = Column("receipt_id", Integer(), ForeignKey(
+        "RECEIPTS.id"), nullable=False, index=True)
+    item_type = Column("item_type", String(10))
+    item_id = Column("item_id", Integer())
+    name = Column("name", String(255))
+    variant = Column("variant", String(30))
+    quantity = Column("quantity", Integer())
+    price = Column("price", Float())
+
+    def __init__(self, item_type: str, item_id: int, name: str, variant: str, quantity: int, price: float, receipt_id: int = None):
+        super().__init__()
+        self.receipt_id = receipt_id
+        self.item_type = item_type
+        self.item_id = item_id
+        self.name = name
+        self.variant = variant
+        self.quantity = quantity
+        self.price = price
+
+    def __str__(self) -> str:
+        return f"<OrderLine receipt={self.receipt_id} {self.name} {self.variant} x{self.quantity} price {self.price:.02f}>"
+
+    def get_id(self) -> int:
+        return self.id
+
+    def get_receipt_id(self) -> int:
+        return self.receipt_id
+
+    def get_item_type(self) -> str:
+        "drink or bakery."
+        return self.item_type
+
+    def get_item_id(self) -> int:
+        return self.item_id
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_variant(self) -> str:
+        return self.variant
+
+    def get_quantity(self) -> int:
+        return self.quantity
+
+    def get_price(self) -> float:
+        "return unit price."
+        return self.price
+
+    def get_row(self) -> dict:
+        "return the line as a column -> value dict for bulk insert."
+        return {
+            "receipt_id": self.receipt_id,
+            "item_type": self.item_type,
+            "item_id": self.item_id,
+            "name": self.name,
+            "variant": self.variant,
+            "quantity": self.quantity,
+            "price": self.price
+        }
+
+
+class ArchivePart(Schema):
+    "one month of rows moved out of LOGS or RECEIPTS into a compressed archive file."
+    __tablename__ = "ARCHIVES"
+    id = Column("id", Integer(), primary_key=True)
+    table_name = Column("table_name", String(30), nullable=False)
+    month = Column("month", String(7), nullable=False)
+    path = Column("path", String(255), nullable=False)
+    size = Column("size", Integer(), nullable=False)
+    rows = Column("rows", Integer(), nullable=False)
+    first_id = Column("first_id", Integer())
+    last_id = Column("last_id", Integer())
+    first_timestamp = Column("first_timestamp", Integer())
+    last_timestamp = Column("last_timestamp", Integer())
+
+    def __init__(self, table_name: str, month: str, path: str):
+        super().__init__()
+        self.table_name = table_name
+        self.month = month
+        self.path = path
+        self.size = 0
+        self.rows = 0
+
+    def __str__(self) -> str:
+        return f"<ArchivePart {self.table_name} {self.month} rows={self.rows} size={self.size}>"
+
+    def get_table_name(self) -> str:
+        return self.table_name
+
+    def get_month(self) -> str:
+        "YYYY-MM of the rows' timestamps."
+        return self.month
+
+    def get_path(self) -> str:
+        "file name relative to the archive folder."
+        return self.path
+
+    def get_size(self) -> int:
+        "committed bytes, anything after it is an unfinished batch."
+        return self.size
+
+    def get_rows(self) -> int:
+        return self.rows
+
+    def get_first_id(self) -> int:
+        return self.first_id
+
+    def get_last_id(self) -> int:
+        return self.last_id
+
+    def get_first_timestamp(self) -> int:
+        return self.first_timestamp
+
+    def get_last_timestamp(self) -> int:
+        return self.last_timestamp
+
+
+# natural keys the upserts conflict on
+UNIQUE_COLUMNS = [
+    (User.__tablename__, "username"),
+    (Drink.__tablename__, "name"),
+    (Bakery.__tablename__, "name")
+]
+
+# ORDER_LINES.item_type of the rows of a product table
+ITEM_TYPES = {
+    Drink.__tablename__: "drink",
+    Bakery.__tablename__: "bakery"
+}
+
+# table -> {value: [ids]} of the duplicates that kept migrate() from adding a unique index
+DUPLICATES: dict[str, dict[str, list[int]]] = dict()
+
+
+def find_duplicates(connection, table: str, column: str) -> dict[str, list[int]]:
+    "return every value of table.column held by more than one row with the ids of those rows."
+    rows = connection.execute(text(
+        f'SELECT {column}, GROUP_CONCAT(id) FROM "{table}" GROUP BY {column} HAVING COUNT(*) > 1')).fetchall()
+    return {value: sorted(int(id) for id in ids.split(",")) for value, ids in rows}
+
+
+def merge_duplicates(table: str) -> int:
+    """
+    merge the duplicate rows of table into the oldest one and add its unique index.\n
+    order lines of a removed product are moved to the kept one first, and every merge
+    is written to the audit log. return the number of rows removed.
+    """
+    column = dict(UNIQUE_COLUMNS)[table]
+    removed = 0
+    with engine.begin() as connection:
+        for value, ids in find_duplicates(connection, table, column).items():
+            keep, others = ids[0], ids[1:]
+            if table in ITEM_TYPES:
+                connection.execute(text(
+                    f'UPDATE "{OrderLine.__tablename__}" SET item_id = :keep WHERE item_type = :type AND item_id IN ({",".join(map(str, others))})'),
+                    {"keep": keep, "type": ITEM_TYPES[table]})
+            connection.execute(text(
+                f'DELETE FROM "{table}" WHERE id IN ({",".join(map(str, others))})'))
+            connection.execute(Log.__table__.insert().values(Log(
+                f"Merge {len(others)} duplicate {table} rows of {value} into id {keep}.").get_row()))
+            removed += len(others)
+        connection.execute(text(
+            f'CREATE UNIQUE INDEX IF NOT EXISTS "ix_{table}_{column}" ON "{table}" ({column})'))
+    DUPLICATES.pop(table, None)
+    return removed
+
+
+# full-text indexes over the free-text description columns, table -> FTS5 table
+SEARCH_TABLES = {
+    Log.__tablename__: "LOGS_FTS",
+    Receipt.__tablename__: "RECEIPTS_FTS"
+}
+
+
+def create_search_index(connection, table: str) -> bool:
+    """
+    create the external-content FTS5 index of table and the triggers that keep it in
+    sync with every insert, update and delete, whoever makes them. an index created
+    here is filled from the rows already in table. return True if it was created.
+    """
+    fts = SEARCH_TABLES[table]
+    exists = connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts}).first()
+    if exists is not None:
+        return False
+
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5(description, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')"))
+    connection.execute(text(
+        f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, description) VALUES (new.id, new.description); END"))
+    connection.execute(text(
+        f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, description) VALUES ('delete', old.id, old.description); END"))
+    connection.execute(text(
+        f"CREATE TRIGGER {fts}_update AFTER UPDATE OF description ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, description) VALUES ('delete', old.id, old.description); "
+        f"INSERT INTO {fts}(rowid, description) VALUES (new.id, new.description); END"))
+    connection.execute(text(
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    return True
+
+
+def migrate(batch_size: int = 1000) -> None:
+    """
+    bring a database made by an older version up to date.\n
+    LOGS and RECEIPTS get the indexed timestamp column, backfilled from date and time.\n
+    USERS.username and the product names get their unique index. a table with duplicates
+    is left without it and reported in DUPLICATES until an admin merges them with
+    merge_duplicates (python -m data.orm.schema --merge).\n
+    LOGS and RECEIPTS get their full-text index.
+    """
+    inspector = inspect(engine)
+    for table, column in UNIQUE_COLUMNS:
+        indexes = [index["name"] for index in inspector.get_indexes(table)]
+        if f"ix_{table}_{column}" in indexes:
+            continue
+        with engine.begin() as connection:
+            duplicates = find_duplicates(connection, table, column)
+            if len(duplicates) > 0:
+                DUPLICATES[table] = duplicates
+                print(f"{table}.{column} has duplicates, not adding its unique index: " +
+                      ", ".join(f"{value!r} (ids {ids})" for value, ids in duplicates.items()), file=sys.stderr)
+                continue
+            connection.execute(text(
+                f'CREATE UNIQUE INDEX "ix_{table}_{column}" ON "{table}" ({column})'))
+
+    for table in [Log.__tablename__, Receipt.__tablename__]:
+        columns = [column["name"] for column in inspector.get_columns(table)]
+        with engine.begin() as connection:
+            if "timestamp" not in columns:
+                connection.execute(
+                    text(f'ALTER TABLE "{table}" ADD COLUMN timestamp INTEGER'))
+            connection.execute(
+                text(f'CREATE INDEX IF NOT EXISTS "ix_{table}_timestamp" ON "{table}" (timestamp)'))
+
+        # a row whose date or time cannot be parsed keeps a NULL timestamp, the scan
+        # moves on by id so it is only tried once per start
+        last_id = 0
+        skipped = 0
+        while True:
+            with engine.begin() as connection:
+                rows = connection.execute(text(
+                    f'SELECT id, date, time FROM "{table}" WHERE timestamp IS NULL AND id > :id ORDER BY id LIMIT :n'),
+                    {"id": last_id, "n": batch_size}).fetchall()
+                if len(rows) == 0:
+                    break
+                updates = list()
+                for id, date, time in rows:
+                    try:
+                        updates.append({"id": id, "timestamp": to_timestamp(date, time)})
+                    except ValueError:
+                        skipped += 1
+                if len(updates) > 0:
+                    connection.execute(
+                        text(f'UPDATE "{table}" SET timestamp = :timestamp WHERE id = :id'), updates)
+                last_id = rows[-1][0]
+        if skipped > 0:
+            print(f"{table}: {skipped} rows with a malformed date or time left without timestamp",
+                  file=sys.stderr)
+
+    for table in SEARCH_TABLES:
+        with engine.begin() as connection:
+            create_search_index(connection, table)
+
+
+# create tables added after the database file was made (e.g. ORDER_LINES)
+Schema.metadata.create_all(engine)
+migrate()
+
+if __name__ == "__main__" and "--merge" in sys.argv:
+    for table in list(DUPLICATES):
+        print(f"{table}: merged {merge_duplicates(table)} duplicate rows")
@@ -0,0 +1,61 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from data.orm.data_access_object import AppDAO, DAO
+
+
+class TaskSignals(QObject):
+    finished = Signal(object)
+    failed = Signal(object)
+
+
+class Task(QRunnable):
+    "one DAO call, run on a pool thread as its own unit of work."
+
+    def __init__(self, type: str, function):
+        QRunnable.__init__(self)
+        # DAOExecutor keeps the task until its callback ran, the pool must not free it
+        self.setAutoDelete(False)
+        self.type = type
+        self.function = function
+        self.signals = TaskSignals()
+
+    def run(self) -> None:
+        try:
+            with AppDAO.unit_of_work() as session:
+                result = self.function(AppDAO.create_dao(self.type, session))
+        except Exception as error:
+            self.signals.failed.emit(error)
+        else:
+            self.signals.finished.emit(result)
+
+
+class DAOExecutor:
+    """
+    run DAO calls off the GUI thread.\n
+    function gets a fresh DAO of type, its result is delivered to on_done
+    (or the exception to on_error) back on the GUI thread.
+    """
+    pool = QThreadPool()
+    __pending: set[Task] = set()
+
+    @staticmethod
+    def submit(type: str, function, on_done=None, on_error=None) -> Task:
+        task = Task(type, function)
+        DAOExecutor.__pending.add(task)
+        task.signals.finished.connect(
+            lambda result: DAOExecutor.__finish(task, on_done, result))
+        task.signals.failed.connect(
+            lambda error: DAOExecutor.__finish(task, on_error, error))
+        DAOExecutor.pool.start(task)
+        return task
+
+    @staticmethod
+    def wait() -> None:
+        "block until every submitted task is done."
+        DAOExecutor.pool.waitForDone()
+
+    @staticmethod
+    def __finish(task: Task, callback, value) -> None:
+        DAOExecutor.__pending.discard(task)
+        if callback is not None:
+            callback(value)
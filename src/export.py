@@ -0,0 +1,114 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Callable
+
+from data.orm.data_access_object import AppDAO
+
+FORMATS = ["csv", "jsonl"]
+KINDS = ["log", "receipt"]
+
+LOG_COLUMNS = ["id", "date", "time", "timestamp", "description"]
+# one CSV row per order line, the receipt's columns repeated on each
+RECEIPT_COLUMNS = LOG_COLUMNS + ["item_type",
+                                 "item_id", "name", "variant", "quantity", "price"]
+LINE_COLUMNS = RECEIPT_COLUMNS[len(LOG_COLUMNS):]
+
+# rows between two progress reports
+PROGRESS_STEP = 10000
+
+
+def write_csv(kind: str, file) -> Callable[[dict], None]:
+    "return a function writing one exported row to file as CSV, after the header."
+    writer = csv.writer(file)
+    writer.writerow(LOG_COLUMNS if kind == "log" else RECEIPT_COLUMNS)
+
+    def write(row: dict) -> None:
+        values = [row[column] for column in LOG_COLUMNS]
+        if kind == "log":
+            writer.writerow(values)
+            return
+        for line in row["lines"] or [dict()]:
+            writer.writerow(values + [line.get(column)
+                            for column in LINE_COLUMNS])
+
+    return write
+
+
+def write_jsonl(kind: str, file) -> Callable[[dict], None]:
+    "return a function writing one exported row to file as a JSON line."
+    def write(row: dict) -> None:
+        file.write(json.dumps(row, ensure_ascii=False))
+        file.write("\n")
+
+    return write
+
+
+def export(kind: str, path: str, format: str = None, start: datetime = None, end: datetime = None,
+           progress: Callable[[int, int], None] = None) -> int:
+    """
+    write every log or receipt with start <= time < end to path, archived rows included.\n
+    rows are streamed from the database in keyset batches and written one by one, so
+    memory stays flat however large the table is. format defaults to path's extension.
+    progress(done, total) is called every PROGRESS_STEP rows, total is an estimate
+    until the last call. the file only appears at path once the export is complete.
+    return the number of rows exported.
+    """
+    format = format or os.path.splitext(path)[1].lstrip(".")
+    if kind not in KINDS or format not in FORMATS:
+        raise ValueError(f"cannot export {kind} as {format}")
+
+    dao = AppDAO.get_dao(kind)
+    done = 0
+    temp_path = path + ".part"
+    # rows must not move into the archive between reading the archive and the tables
+    with AppDAO.get_retention().paused():
+        total = dao.count(start, end)
+        try:
+            with open(temp_path, "w", newline="", encoding="utf-8") as file:
+                write = (write_csv if format == "csv" else write_jsonl)(kind, file)
+                for row in dao.stream(start, end):
+                    write(row)
+                    done += 1
+                    if progress is not None and done % PROGRESS_STEP == 0:
+                        progress(done, max(total, done))
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        finally:
+            AppDAO.release()
+
+    if progress is not None:
+        progress(done, done)
+    return done
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="export logs or receipts as CSV or JSON Lines")
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("path", help="output file, .csv or .jsonl")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--start", type=datetime.fromisoformat,
+                        help="first day included, YYYY-MM-DD")
+    parser.add_argument("--end", type=datetime.fromisoformat,
+                        help="first day excluded, YYYY-MM-DD")
+    args = parser.parse_args()
+
+    def report(done: int, total: int) -> None:
+        print(f"\r{done}/{total} rows", end="", file=sys.stderr, flush=True)
+
+    count = export(args.kind, args.path, args.format,
+                   args.start, args.end, report)
+    print(f"\nexported {count} {args.kind}s to {args.path}", file=sys.stderr)
+    AppDAO.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,13 +2,22 @@ import sys
 from PySide6.QtWidgets import QApplication
 
 from application import Application
+from assets import Assets
+from data.orm.data_access_object import AppDAO
+from theme import Theme
 
 
 def main() -> int:
     root = QApplication(sys.argv)
+    Theme.apply(root)
+    Theme.watch(root)
+    Assets.preload()
     app = Application()
     app.start()
-    return root.exec()
+    AppDAO.get_retention().start()
+    code = root.exec()
+    AppDAO.shutdown()
+    return code
 
 
 if __name__ == "__main__":
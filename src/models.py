@@ -1,16 +1,336 @@
+import bisect
+import csv
+import math
+import os
+import unicodedata
 from abc import ABC
+from collections import deque
 from datetime import date
+from time import perf_counter
 from dateutil import relativedelta
 from shiboken6 import delete
 
 from data.orm.schema import *
 from data.orm.data_access_object import *
+from executor import DAOExecutor
 
 
 class Model(ABC):
     pass
 
 
+class SearchIndex:
+    """
+    as-you-type search over item names, kept in memory and updated one item at a time.\n
+    a term of 3 or more characters is looked up through a trigram index and then
+    checked as a substring, a shorter term matches the start of a word through a
+    sorted word list. scripts written without spaces between words (Thai, Lao, ...)
+    have no words to start, so a short term in them is looked up as a substring
+    through an index of their 1 and 2 character pieces. every term of a query must
+    match. names are compared after NFC normalization and casefolding.
+    """
+    GRAM = 3
+    # code point ranges of scripts that do not separate words with spaces
+    UNSEGMENTED = [(0x0E00, 0x0EFF), (0x1000, 0x109F), (0x1780, 0x17FF),
+                   (0x3040, 0x30FF), (0x3400, 0x9FFF)]
+
+    def __init__(self, key, text):
+        "key(item) identifies an item, text(item) is what is searched."
+        self.__key = key
+        self.__text = text
+        self.__items: dict = dict()
+        self.__texts: dict[object, str] = dict()
+        self.__grams: dict[str, set] = dict()
+        self.__words: list[tuple] = list()
+        self.__pieces: dict[str, set] = dict()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return unicodedata.normalize("NFC", text).casefold()
+
+    @staticmethod
+    def grams(text: str) -> set[str]:
+        return {text[i:i + SearchIndex.GRAM] for i in range(len(text) - SearchIndex.GRAM + 1)}
+
+    @staticmethod
+    def is_unsegmented(text: str) -> bool:
+        return any(start <= ord(char) <= end for char in text for start, end in SearchIndex.UNSEGMENTED)
+
+    @staticmethod
+    def pieces(text: str) -> set[str]:
+        "return the substrings shorter than GRAM that contain an unsegmented character."
+        return {text[i:i + n] for n in range(1, SearchIndex.GRAM) for i in range(len(text) - n + 1)
+                if SearchIndex.is_unsegmented(text[i:i + n])}
+
+    def size(self) -> int:
+        return len(self.__items)
+
+    def get(self, key) -> object:
+        "return the indexed item with key, None if there is none."
+        return self.__items.get(key)
+
+    def add(self, item: object) -> None:
+        key = self.__key(item)
+        if key in self.__items:
+            self.remove(item)
+        text = SearchIndex.normalize(self.__text(item))
+        self.__items[key] = item
+        self.__texts[key] = text
+        for gram in SearchIndex.grams(text):
+            self.__grams.setdefault(gram, set()).add(key)
+        for word in set(text.split()):
+            bisect.insort(self.__words, (word, key))
+        for piece in SearchIndex.pieces(text):
+            self.__pieces.setdefault(piece, set()).add(key)
+
+    def remove(self, item: object) -> None:
+        key = self.__key(item)
+        text = self.__texts.pop(key, None)
+        if text is None:
+            return
+        del self.__items[key]
+        for gram in SearchIndex.grams(text):
+            keys = self.__grams[gram]
+            keys.discard(key)
+            if len(keys) == 0:
+                del self.__grams[gram]
+        for word in set(text.split()):
+            row = bisect.bisect_left(self.__words, (word, key))
+            del self.__words[row]
+        for piece in SearchIndex.pieces(text):
+            keys = self.__pieces[piece]
+            keys.discard(key)
+            if len(keys) == 0:
+                del self.__pieces[piece]
+
+    def clear(self) -> None:
+        self.__items.clear()
+        self.__texts.clear()
+        self.__grams.clear()
+        self.__words.clear()
+        self.__pieces.clear()
+
+    def search(self, query: str) -> list:
+        "return the items matching every term of query, in no particular order."
+        terms = SearchIndex.normalize(query).split()
+        if len(terms) == 0:
+            return list(self.__items.values())
+
+        keys = None
+        # the longest term usually matches the fewest items
+        for term in sorted(terms, key=len, reverse=True):
+            matched = self.__match(term)
+            keys = matched if keys is None else keys & matched
+            if len(keys) == 0:
+                return list()
+        return [self.__items[key] for key in keys]
+
+    def __match(self, term: str) -> set:
+        if len(term) < SearchIndex.GRAM and SearchIndex.is_unsegmented(term):
+            return set(self.__pieces.get(term, ()))
+        if len(term) < SearchIndex.GRAM:
+            keys = set()
+            row = bisect.bisect_left(self.__words, (term,))
+            while row < len(self.__words) and self.__words[row][0].startswith(term):
+                keys.add(self.__words[row][1])
+                row += 1
+            return keys
+
+        postings = list()
+        for gram in SearchIndex.grams(term):
+            if gram not in self.__grams:
+                return set()
+            postings.append(self.__grams[gram])
+        postings.sort(key=len)
+        keys = set(postings[0])
+        for posting in postings[1:]:
+            keys &= posting
+        return {key for key in keys if term in self.__texts[key]}
+
+
+class Catalog:
+    """
+    in-memory product catalog shared by every model.\n
+    products are loaded once, kept sorted by name and detached from the session
+    so reading them never goes back to the database. every change bumps the version
+    and replaces the snapshot, so a snapshot handed out is never modified.
+    """
+    __products: tuple = None
+    __names: list = None
+    __index: SearchIndex = None
+    __version = 0
+
+    @staticmethod
+    def get_products() -> tuple[Drink | Bakery]:
+        "return the current snapshot sorted by name."
+        if Catalog.__products is None:
+            Catalog.__load()
+        return Catalog.__products
+
+    @staticmethod
+    def get_version() -> int:
+        return Catalog.__version
+
+    @staticmethod
+    def search(query: str) -> list[Drink | Bakery]:
+        "return the products whose name matches query, sorted by name."
+        if Catalog.__products is None:
+            Catalog.__load()
+        return sorted(Catalog.__index.search(query), key=lambda x: x.name)
+
+    @staticmethod
+    def add(item: Drink | Bakery) -> None:
+        if Catalog.__products is None or item.get_id() is None:
+            return
+        if item in AppDAO.local_session:
+            AppDAO.local_session.expunge(item)
+        Catalog.__insert(list(Catalog.__products), item)
+
+    @staticmethod
+    def remove(item: Drink | Bakery) -> None:
+        if Catalog.__products is None:
+            return
+        products = list(Catalog.__products)
+        row = Catalog.__find(item)
+        if row < 0:
+            return
+        del products[row]
+        del Catalog.__names[row]
+        Catalog.__index.remove(item)
+        Catalog.__publish(products)
+
+    @staticmethod
+    def refresh(item: Drink | Bakery) -> Drink | Bakery:
+        "reload one product after it was updated and return the new instance."
+        if isinstance(item, Drink):
+            fresh = AppDAO.get_dao("drink").get_drink_by_id(item.get_id())
+        else:
+            fresh = AppDAO.get_dao("bakery").get_bakery_by_id(item.get_id())
+
+        if fresh is None or Catalog.__products is None:
+            return fresh
+
+        AppDAO.local_session.expunge(fresh)
+        products = list(Catalog.__products)
+        row = Catalog.__find(item)
+        if row >= 0:
+            del products[row]
+            del Catalog.__names[row]
+        Catalog.__index.remove(item)
+        Catalog.__insert(products, fresh)
+        return fresh
+
+    @staticmethod
+    def key(item: Drink | Bakery) -> tuple:
+        "drinks and bakeries have separate ids, so the type is part of the key."
+        return type(item).__name__, item.get_id()
+
+    @staticmethod
+    def invalidate() -> None:
+        "drop the cache, the next read loads it again."
+        Catalog.__products = None
+        Catalog.__names = None
+        Catalog.__index = None
+        Catalog.__version += 1
+
+    @staticmethod
+    def __load() -> None:
+        products = list()
+        products.extend(AppDAO.get_dao("drink").get_all_drinks())
+        products.extend(AppDAO.get_dao("bakery").get_all_bakeries())
+        for product in products:
+            AppDAO.local_session.expunge(product)
+        products.sort(key=lambda x: x.name)
+        Catalog.__names = [product.get_name() for product in products]
+        Catalog.__index = SearchIndex(Catalog.key, lambda x: x.get_name())
+        for product in products:
+            Catalog.__index.add(product)
+        Catalog.__products = tuple(products)
+
+    @staticmethod
+    def __find(item: Drink | Bakery) -> int:
+        """
+        return the row of item in the current snapshot, -1 if missing.\n
+        the snapshot's own instance gives the name to bisect to, item may carry a newer
+        one, then only the run of products with that name is scanned.
+        """
+        product = Catalog.__index.get(Catalog.key(item))
+        if product is None:
+            return -1
+        name = product.get_name()
+        row = bisect.bisect_left(Catalog.__names, name)
+        while row < len(Catalog.__names) and Catalog.__names[row] == name:
+            if Catalog.__products[row] is product:
+                return row
+            row += 1
+        return -1
+
+    @staticmethod
+    def __insert(products: list, item: Drink | Bakery) -> None:
+        row = bisect.bisect_right(Catalog.__names, item.get_name())
+        products.insert(row, item)
+        Catalog.__names.insert(row, item.get_name())
+        Catalog.__index.add(item)
+        Catalog.__publish(products)
+
+    @staticmethod
+    def __publish(products: list) -> None:
+        Catalog.__products = tuple(products)
+        Catalog.__version += 1
+
+
+class LoginService:
+    """
+    checks credentials with one username lookup (served by UserCache when warm)
+    and publishes how long each login took, from button press to answer.
+    """
+    SAMPLES = 256
+    __latencies: deque = deque(maxlen=SAMPLES)
+    __listeners: list = list()
+
+    @staticmethod
+    def login(username: str, password: str, on_done) -> None:
+        "look username up off the GUI thread, on_done(user) gets the user or None when the login fails."
+        start = perf_counter()
+
+        def done(user: User) -> None:
+            if user is not None and user.get_password() != password:
+                user = None
+            LoginService.__publish(perf_counter() - start)
+            on_done(user)
+
+        DAOExecutor.submit(
+            "user", lambda dao: dao.get_user_by_username(username), done, lambda error: done(None))
+
+    @staticmethod
+    def add_latency_listener(function) -> None:
+        "function(seconds) is called after every login."
+        LoginService.__listeners.append(function)
+
+    @staticmethod
+    def remove_latency_listener(function) -> None:
+        LoginService.__listeners.remove(function)
+
+    @staticmethod
+    def get_latency() -> dict:
+        "return count, last, mean and p95 of the recent logins in milliseconds."
+        samples = sorted(LoginService.__latencies)
+        if len(samples) == 0:
+            return {"count": 0, "last_ms": 0.0, "mean_ms": 0.0, "p95_ms": 0.0}
+        return {
+            "count": len(samples),
+            "last_ms": LoginService.__latencies[-1] * 1000,
+            "mean_ms": sum(samples) / len(samples) * 1000,
+            "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000
+        }
+
+    @staticmethod
+    def __publish(seconds: float) -> None:
+        LoginService.__latencies.append(seconds)
+        for listener in LoginService.__listeners:
+            listener(seconds)
+
+
 class AccountModel(Model):
     LENGHT_LIMIT = 4
     __current_user: User
@@ -25,12 +345,15 @@ class AccountModel(Model):
     def get_all_account(self) -> list[User]:
         return self.__user_dao.get_all_users()
 
-    def create_new_account(self, user: User) -> None:
-        self.__user_dao.add_user(user)
+    def create_new_account(self, user: User) -> bool:
+        "add user, return False when the username is already taken."
+        if not self.__user_dao.add_user(user):
+            return False
 
         log = Log(
             f"ADMIN: {self.__current_user.get_username()} created new account for {user.get_username()}.")
         self.__log_dao.add_log(log)
+        return True
 
     def generate_username(self, fname: str, lname: str) -> str:
         username = str()
@@ -72,8 +395,13 @@ class LoginModel(Model):
         self.__current_username = username
         self.__current_password = password
 
-    def retrive_user(self, username: str) -> None:
-        self.__current_user = self.user_dao.get_user_by_username(username)
+    def load_user(self, username: str, on_done) -> None:
+        "log in through LoginService, on_done() is called once the user is set."
+        def done(user: User) -> None:
+            self.__current_user = user
+            on_done()
+
+        LoginService.login(username, self.__current_password, done)
 
     def verify_login(self) -> None:
         if self.__current_user is None:
@@ -86,9 +414,6 @@ class LoginModel(Model):
     def is_valid(self) -> bool:
         return self.valid_login
 
-    def set_current_user(self, username: str) -> None:
-        self.__current_user = self.user_dao.get_user_by_username(username)
-
     def get_current_user(self) -> User:
         return self.__current_user
 
@@ -102,6 +427,16 @@ class LogModel(Model):
     def get_all_logs(self) -> list[Log]:
         return self.__log_dao.get_all_logs()
 
+    def load_all_logs(self, on_done) -> None:
+        "get_all_logs off the GUI thread, on_done(logs) gets the result."
+        DAOExecutor.submit("log", lambda dao: dao.get_all_logs(),
+                           on_done, lambda error: on_done(list()))
+
+    def load_logs_before(self, log: Log, on_done) -> None:
+        "page_before off the GUI thread, on_done(logs) gets the page, empty on failure."
+        DAOExecutor.submit("log", lambda dao: dao.page_before(log.get_id()),
+                           on_done, lambda error: on_done(list()))
+
 
 class MenuModel(Model):
     __drink_dao: DrinkDAO
@@ -111,18 +446,134 @@ class MenuModel(Model):
         self.__drink_dao = AppDAO.get_dao("drink")
         self.__bakery_dao = AppDAO.get_dao("bakery")
 
-    def get_all_products(self) -> list[Drink | Bakery]:
-        products = list()
-        products.extend(self.__drink_dao.get_all_drinks())
-        products.extend(self.__bakery_dao.get_all_bakeries())
-        products.sort(key=lambda x: x.name)
-        return products
+    def get_all_products(self) -> tuple[Drink | Bakery]:
+        return Catalog.get_products()
+
+    def get_catalog_version(self) -> int:
+        return Catalog.get_version()
+
+    def search(self, query: str) -> list[Drink | Bakery]:
+        return Catalog.search(query)
 
     def update_drink(self, id: int, name: str = None, hprice: float = None, cprice: float = None, bprice: float = None) -> None:
         self.__drink_dao.update_drink(id, name, hprice, cprice, bprice)
+        Catalog.invalidate()
 
     def update_bakery(self, id: int, name: str = None, price: float = None) -> None:
         self.__bakery_dao.update_bakery(id, name, price)
+        Catalog.invalidate()
+
+
+def to_cents(price: float) -> int:
+    "convert a menu price to integer cents, all cart arithmetic is done in cents."
+    return int(round(price * 100))
+
+
+def format_cents(cents: int) -> str:
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+class CartLine:
+    "one cart row: a product in one variant with its quantity."
+
+    def __init__(self, product: Drink | Bakery, variant: str, name: str, unit_cents: int):
+        self.product = product
+        self.variant = variant
+        self.name = name
+        self.unit_cents = unit_cents
+        self.quantity = 0
+
+    def get_key(self) -> tuple:
+        return CartModel.key(self.product, self.variant)
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_quantity(self) -> int:
+        return self.quantity
+
+    def get_unit_cents(self) -> int:
+        return self.unit_cents
+
+    def get_cents(self) -> int:
+        return self.unit_cents * self.quantity
+
+    def get_price(self) -> str:
+        return format_cents(self.get_cents())
+
+    def get_line(self) -> OrderLine:
+        "return the receipt line for this cart row."
+        item_type = "drink" if isinstance(self.product, Drink) else "bakery"
+        return OrderLine(item_type, self.product.get_id(), self.product.get_name(),
+                         self.variant, self.quantity, self.unit_cents / 100)
+
+
+class CartModel(Model):
+    """
+    the order being taken, lines keyed by (item type, item id, variant).\n
+    adding a product that is already in the cart merges into its line, a line
+    whose quantity reaches 0 is dropped. the total is kept in integer cents and
+    updated with every change, so it never drifts and never needs a full pass.
+    """
+
+    def __init__(self):
+        self.__lines: dict[tuple, CartLine] = dict()
+        self.__total_cents = 0
+
+    @staticmethod
+    def key(product: Drink | Bakery, variant: str = None) -> tuple:
+        return type(product).__name__, product.get_id(), variant
+
+    def add(self, product: Drink | Bakery, price: float, name: str, variant: str = None, quantity: int = 1) -> CartLine:
+        "add quantity of product, return its (possibly merged) line."
+        key = CartModel.key(product, variant)
+        line = self.__lines.get(key)
+        if line is None:
+            line = CartLine(product, variant, name, to_cents(price))
+            self.__lines[key] = line
+        return self.change_quantity(key, quantity)
+
+    def change_quantity(self, key: tuple, delta: int) -> CartLine:
+        "change a line's quantity by delta, return the line (quantity 0 means it was removed)."
+        line = self.__lines.get(key)
+        if line is None:
+            return None
+        delta = max(delta, -line.quantity)
+        line.quantity += delta
+        self.__total_cents += delta * line.unit_cents
+        if line.quantity == 0:
+            del self.__lines[key]
+        return line
+
+    def remove(self, key: tuple) -> CartLine:
+        line = self.__lines.get(key)
+        if line is None:
+            return None
+        return self.change_quantity(key, -line.quantity)
+
+    def get_line(self, key: tuple) -> CartLine:
+        return self.__lines.get(key)
+
+    def get_lines(self) -> list[CartLine]:
+        "return the lines in the order they were first added."
+        return list(self.__lines.values())
+
+    def get_order_lines(self) -> list[OrderLine]:
+        return [line.get_line() for line in self.__lines.values()]
+
+    def get_total_cents(self) -> int:
+        return self.__total_cents
+
+    def get_total(self) -> str:
+        return format_cents(self.__total_cents)
+
+    def is_empty(self) -> bool:
+        return len(self.__lines) == 0
+
+    def clear(self) -> None:
+        self.__lines.clear()
+        self.__total_cents = 0
 
 
 class OrderModel(Model):
@@ -130,26 +581,33 @@ class OrderModel(Model):
 
     def __init__(self):
         self.__receipt_dao = AppDAO.get_dao("receipt")
+        self.cart = CartModel()
+
+    def get_cart(self) -> CartModel:
+        return self.cart
 
-    def make_new_receipt(self, receipt: Receipt) -> None:
-        print("Model ->" + str(receipt))
-        self.__receipt_dao.add_receipt(receipt)
+    def make_new_receipt(self, receipt: Receipt, lines: list[OrderLine] = None) -> None:
+        self.__receipt_dao.add_receipt_with_lines(receipt, lines or list())
+
+    def make_new_receipt_async(self, receipt: Receipt, lines: list[OrderLine], on_done, on_error) -> None:
+        "make_new_receipt off the GUI thread, on_done() or on_error(error) is called when it ends."
+        DAOExecutor.submit("receipt", lambda dao: dao.add_receipt_with_lines(receipt, lines),
+                           lambda result: on_done(), on_error)
 
 
 class OrderListModel(Model):
-    __drink_dao: DrinkDAO
-    __bakery_dao: BakeryDAO
 
     def __init__(self):
-        self.__drink_dao = AppDAO.get_dao("drink")
-        self.__bakery_dao = AppDAO.get_dao("bakery")
+        pass
 
-    def get_all_products(self) -> list:
-        products = list()
-        products.extend(self.__drink_dao.get_all_drinks())
-        products.extend(self.__bakery_dao.get_all_bakeries())
-        products.sort(key=lambda x: x.name)
-        return products
+    def get_all_products(self) -> tuple[Drink | Bakery]:
+        return Catalog.get_products()
+
+    def get_catalog_version(self) -> int:
+        return Catalog.get_version()
+
+    def search(self, query: str) -> list[Drink | Bakery]:
+        return Catalog.search(query)
 
 
 class ReceiptModel(Model):
@@ -161,6 +619,157 @@ class ReceiptModel(Model):
     def get_all_receipt(self) -> list[Receipt]:
         return self.__receipt_dao.get_all_receipts()
 
+    def load_all_receipt(self, on_done) -> None:
+        "get_all_receipt off the GUI thread, on_done(receipts) gets the result."
+        DAOExecutor.submit("receipt", lambda dao: dao.get_all_receipts(),
+                           on_done, lambda error: on_done(list()))
+
+    def load_receipts_before(self, receipt: Receipt, on_done) -> None:
+        "page_before off the GUI thread, on_done(receipts) gets the page, empty on failure."
+        DAOExecutor.submit("receipt", lambda dao: dao.page_before(receipt.get_id()),
+                           on_done, lambda error: on_done(list()))
+
+
+class MenuImport:
+    """
+    outcome of importing one CSV file into the menu.\n
+    errors are the (line, message) of every row left out as invalid.
+    """
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+        self.added = 0
+        self.updated = 0
+        self.existing = 0
+        self.duplicates = 0
+        self.errors: list[tuple[int, str]] = list()
+
+    def get_added(self) -> int:
+        return self.added
+
+    def get_updated(self) -> int:
+        return self.updated
+
+    def get_errors(self) -> list[tuple[int, str]]:
+        return self.errors
+
+    def get_summary(self) -> str:
+        "one line for the audit log and the menu page."
+        return (f"Import {self.file_name}: {self.added} added, {self.updated} updated, "
+                f"{self.existing} already on the menu, {self.duplicates} duplicates, {len(self.errors)} invalid.")
+
+
+class MenuImportModel(Model):
+    """
+    add a whole menu from a CSV file with a header row of COLUMNS.\n
+    type is drink or bakery, drinks need hprice, cprice and bprice, bakeries price.
+    rows are validated and deduplicated in memory, then every product is written
+    in one transaction with one audit log for the whole file.
+    """
+    COLUMNS = ["type", "name", "hprice", "cprice", "bprice", "price"]
+    NAME_LENGTH = 255
+
+    def __init__(self):
+        self.__log_dao = AppDAO.get_dao("log")
+
+    def import_file(self, path: str, update: bool = False) -> MenuImport:
+        """
+        import path now, products already on the menu keep their prices unless update.\n
+        return the outcome.
+        """
+        with AppDAO.unit_of_work() as session:
+            report = MenuImportModel.write(path, session, update)
+        self.finish(report)
+        return report
+
+    def load_file(self, path: str, on_done, update: bool = False) -> None:
+        "import_file off the GUI thread, on_done(report) gets the outcome, or None on failure."
+        def done(report: MenuImport) -> None:
+            self.finish(report)
+            on_done(report)
+
+        DAOExecutor.submit("drink", lambda dao: MenuImportModel.write(path, dao.session, update),
+                           done, lambda error: on_done(None))
+
+    def finish(self, report: MenuImport) -> None:
+        "publish a committed import to the catalog and the audit log."
+        if report.get_added() + report.get_updated() > 0:
+            Catalog.invalidate()
+        self.__log_dao.add_log(Log(report.get_summary()))
+
+    @staticmethod
+    def write(path: str, session: Session, update: bool = False) -> MenuImport:
+        "read path and add its products through session, the caller commits."
+        report = MenuImport(os.path.basename(path))
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            drinks, bakeries = MenuImportModel.read(file, report)
+
+        for dao, items in [(AppDAO.create_dao("drink", session), drinks),
+                           (AppDAO.create_dao("bakery", session), bakeries)]:
+            names = dao.get_names()
+            new = [item for item in items if item.get_name() not in names]
+            taken = [item for item in items if item.get_name() in names]
+            report.added += dao.insert_many(new, "name", commit=False)
+            if update:
+                report.updated += dao.insert_many(taken,
+                                                  "name", update=True, commit=False)
+            else:
+                report.existing += len(taken)
+        return report
+
+    @staticmethod
+    def read(file, report: MenuImport) -> tuple[list[Drink], list[Bakery]]:
+        "return the valid products of a CSV file, the first row wins for a repeated name."
+        reader = csv.DictReader(file)
+        missing = {"type", "name"} - set(reader.fieldnames or [])
+        if len(missing) > 0:
+            report.errors.append(
+                (1, f"missing columns: {', '.join(sorted(missing))}"))
+            return list(), list()
+
+        drinks, bakeries = list(), list()
+        seen = set()
+        for row in reader:
+            try:
+                item = MenuImportModel.parse(row)
+            except ValueError as error:
+                report.errors.append((reader.line_num, str(error)))
+                continue
+
+            key = (type(item), item.get_name())
+            if key in seen:
+                report.duplicates += 1
+                continue
+            seen.add(key)
+            (drinks if isinstance(item, Drink) else bakeries).append(item)
+        return drinks, bakeries
+
+    @staticmethod
+    def parse(row: dict) -> Drink | Bakery:
+        "build the product of one CSV row, raise ValueError when it is invalid."
+        name = " ".join((row.get("name") or "").split())
+        if name == "":
+            raise ValueError("name is empty")
+        if len(name) > MenuImportModel.NAME_LENGTH:
+            raise ValueError(f"name is longer than {MenuImportModel.NAME_LENGTH}")
+
+        kind = (row.get("type") or "").strip().lower()
+        if kind == "drink":
+            return Drink(name, *[MenuImportModel.parse_price(row, column) for column in ["hprice", "cprice", "bprice"]])
+        if kind == "bakery":
+            return Bakery(name, MenuImportModel.parse_price(row, "price"))
+        raise ValueError(f"type must be drink or bakery, not {kind!r}")
+
+    @staticmethod
+    def parse_price(row: dict, column: str) -> float:
+        try:
+            price = float(row.get(column) or "")
+        except ValueError:
+            raise ValueError(f"{column} is not a price") from None
+        if not math.isfinite(price) or price < 0:
+            raise ValueError(f"{column} is not a price")
+        return round(price, 2)
+
 
 class MenuEditModel(Model):
     __drink_dao: DrinkDAO
@@ -172,25 +781,44 @@ class MenuEditModel(Model):
         self.__bakery_dao = AppDAO.get_dao("bakery")
         self.__log_dao = AppDAO.get_dao("log")
 
-    def add(self, item: Drink | Bakery) -> None:
+    def add(self, item: Drink | Bakery) -> bool:
+        "add item, return False when a product with the same name already exists."
         if isinstance(item, Drink):
-            self.__drink_dao.add_drink(item)
+            added = self.__drink_dao.add_drink(item)
         else:
-            self.__bakery_dao.add_bakery(item)
+            added = self.__bakery_dao.add_bakery(item)
+        if not added:
+            return False
+        Catalog.add(item)
 
         self.__log_dao.add_log(Log(f"Add {item.get_name()} to system."))
+        return True
 
     def delete(self, item: Drink | Bakery) -> None:
         if isinstance(item, Drink):
             self.__drink_dao.delete_drink_by_id(item.get_id())
         else:
             self.__bakery_dao.delete_bakery_by_id(item.get_id())
+        Catalog.remove(item)
         self.__log_dao.add_log(Log(f"Delete {item.get_name()} from system."))
 
-    def save(self, item: Drink | Bakery, name: str = None, hprice: float = None, cprice: float = None, bprice: float = None) -> None:
+    def save(self, item: Drink | Bakery, name: str = None, hprice: float = None, cprice: float = None, bprice: float = None) -> Drink | Bakery:
+        """
+        update item and return the refreshed catalog instance.\n
+        return None if it was deleted meanwhile, False if its new name is already taken.
+        """
         if isinstance(item, Drink):
-            self.__drink_dao.update_drink(
+            saved = self.__drink_dao.update_drink(
                 item.get_id(), name, hprice, cprice, bprice)
         else:
-            self.__bakery_dao.update_bakery(item.get_id(), name, hprice)
-        self.__log_dao.add_log(Log(f"Update {item.get_name()} from system."))
+            saved = self.__bakery_dao.update_bakery(item.get_id(), name, hprice)
+        item = Catalog.refresh(item)
+        if item is None:
+            Catalog.invalidate()
+            return None
+        # the product is still there, so the update broke the unique name
+        if not saved:
+            return False
+        self.__log_dao.add_log(
+            Log(f"Update {item.get_name()} from system."))
+        return item
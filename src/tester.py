@@ -3,10 +3,12 @@ from PySide6.QtWidgets import *
 from views import *
 from controllers import *
 from models import *
+from theme import Theme
 
 
 def test_widget() -> int:
     app = QApplication(sys.argv)
+    Theme.apply(app)
     w = MenuCreateView()  # change widget here
     w.show()
     return app.exec()
@@ -1,5 +1,9 @@
 import os
+from PySide6.QtCore import QFileSystemWatcher
 from PySide6.QtGui import QFont
+from PySide6.QtWidgets import QApplication
+
+from assets import Assets
 
 
 class Theme:
@@ -25,14 +29,61 @@ class Theme:
     DONGLE_BOLD_65.setPixelSize(65)
     DONGLE_BOLD_65.setBold(True)
 
+    # Stylesheet cache (shared by the whole process)
+    __stylesheet: str = None
+    __stylesheet_mtime: float = None
+    __watcher: QFileSystemWatcher = None
+
     @staticmethod
     def get_stylesheet() -> str:
-        """get style from theme.qss file"""
-        stylesheet: str
-        with open(Theme.__THEME_PATH, "r") as file:
-            stylesheet = file.read()
-        file.close()
-        return stylesheet
+        """get style from theme.qss file (read once, cached by mtime), or from the asset bundle."""
+        if Assets.is_bundled():
+            if Theme.__stylesheet is None:
+                Theme.__stylesheet = Assets.read_bundled("theme.qss").decode()
+            return Theme.__stylesheet
+
+        mtime = os.path.getmtime(Theme.__THEME_PATH)
+        if Theme.__stylesheet is None or mtime != Theme.__stylesheet_mtime:
+            with open(Theme.__THEME_PATH, "r") as file:
+                Theme.__stylesheet = file.read()
+            Theme.__stylesheet_mtime = mtime
+        return Theme.__stylesheet
+
+    @staticmethod
+    def apply(app: QApplication) -> None:
+        """apply the stylesheet once at application level so every widget inherits it."""
+        Assets.install()
+        app.setStyleSheet(Theme.get_stylesheet())
+
+    @staticmethod
+    def reload(app: QApplication) -> bool:
+        """re-apply the stylesheet if theme.qss changed on disk, return True if it did."""
+        mtime = Theme.__stylesheet_mtime
+        stylesheet = Theme.get_stylesheet()
+        if mtime == Theme.__stylesheet_mtime:
+            return False
+        app.setStyleSheet(stylesheet)
+        return True
+
+    @staticmethod
+    def watch(app: QApplication) -> None:
+        """reload the stylesheet whenever theme.qss is saved, only when it is read from disk."""
+        if Assets.is_bundled() or Theme.__watcher is not None:
+            return
+        # the folder is watched too, editors that save by replacing the file drop it from the watcher
+        Theme.__watcher = QFileSystemWatcher(
+            [Theme.__THEME_PATH, Theme.__ROOT_DIR], app)
+        Theme.__watcher.fileChanged.connect(lambda path: Theme.__changed(app))
+        Theme.__watcher.directoryChanged.connect(
+            lambda path: Theme.__changed(app))
+
+    @staticmethod
+    def __changed(app: QApplication) -> None:
+        if not os.path.exists(Theme.__THEME_PATH):
+            return
+        if Theme.__THEME_PATH not in Theme.__watcher.files():
+            Theme.__watcher.addPath(Theme.__THEME_PATH)
+        Theme.reload(app)
 
     #Colors (Just in case)
     # DARK_BROWN = "4A321C"
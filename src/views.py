@@ -1,10 +1,429 @@
+import bisect
 from PySide6.QtCore import *
 from PySide6.QtGui import *
 from PySide6.QtWidgets import *
 from sqlalchemy import func
 
+from assets import Assets
 from theme import Theme
 
+"""
+List View (shared by order list, menu, log and receipt pages)
+"""
+
+
+class ListModel(QAbstractListModel):
+    """
+    hold the items of a list view.\n
+    rows are formatted on demand so only the visible rows are ever turned into text.\n
+    key identifies an item across reloads, sort_key keeps inserted items in order.
+    """
+
+    def __init__(self, formatter, key=id, sort_key=None, parent: QObject = None):
+        QAbstractListModel.__init__(self, parent)
+        self.__formatter = formatter
+        self.__key = key
+        self.__sort_key = sort_key
+        self.__items = list()
+        self.__keys = list()
+        # key -> row, entries below __indexed are exact, the rest are renumbered on lookup
+        self.__rows = dict()
+        self.__indexed = 0
+        self.__texts = list()
+        self.__fetcher = None
+        self.__exhausted = False
+        self.__fetching = False
+        # bumped by set_items, a page fetched for older rows is dropped
+        self.__generation = 0
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.__items)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.__items):
+            return None
+
+        row = index.row()
+        if role == Qt.DisplayRole:
+            if self.__texts[row] is None:
+                self.__texts[row] = self.__formatter(self.__items[row])
+            return self.__texts[row]
+        if role == Qt.UserRole:
+            return self.__items[row]
+        return None
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return (not parent.isValid() and self.__fetcher is not None
+                and not self.__exhausted and not self.__fetching and len(self.__items) > 0)
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        if not self.canFetchMore(parent):
+            return
+        self.__fetching = True
+        generation = self.__generation
+        self.__fetcher(self.__items[-1],
+                       lambda items: self.__fetched(generation, items))
+
+    def set_fetcher(self, fetcher) -> None:
+        """
+        fetcher(last_item, on_done) gets the rows after last_item when the view scrolls
+        to the end and passes them to on_done, which may be called later from the event loop.
+        """
+        self.__fetcher = fetcher
+        self.__exhausted = False
+
+    def set_items(self, items: list) -> None:
+        self.__generation += 1
+        self.__fetching = False
+        self.beginResetModel()
+        self.__items = list(items)
+        self.__keys = [self.__key(item) for item in self.__items]
+        self.__rows = {key: row for row, key in enumerate(self.__keys)}
+        self.__indexed = len(self.__keys)
+        self.__texts = [None] * len(self.__items)
+        self.__exhausted = False
+        self.endResetModel()
+
+    def append_items(self, items: list) -> None:
+        if len(items) == 0:
+            return
+        first = len(self.__items)
+        self.beginInsertRows(QModelIndex(), first, first + len(items) - 1)
+        self.__items.extend(items)
+        for item in items:
+            self.__rows[self.__key(item)] = len(self.__keys)
+            self.__keys.append(self.__key(item))
+        self.__texts.extend([None] * len(items))
+        self.endInsertRows()
+
+    def reconcile(self, items: list) -> None:
+        """
+        bring the rows in line with items by key.\n
+        only rows that were added, removed, moved or changed emit signals,
+        so reloading an unchanged list does nothing.
+        """
+        if len(self.__items) == 0:
+            self.set_items(items)
+            return
+
+        keys = [self.__key(item) for item in items]
+        wanted = set(keys)
+
+        for row in reversed(range(len(self.__keys))):
+            if self.__keys[row] not in wanted:
+                self.__remove_row(row)
+
+        for row, (key, item) in enumerate(zip(keys, items)):
+            if row < len(self.__keys) and self.__keys[row] == key:
+                self.__update_row(row, item)
+            elif key in self.__rows:
+                source = self.__row_of(key)
+                self.beginMoveRows(QModelIndex(), source,
+                                   source, QModelIndex(), row)
+                self.__items.insert(row, self.__items.pop(source))
+                self.__keys.insert(row, self.__keys.pop(source))
+                self.__texts.insert(row, self.__texts.pop(source))
+                self.__rows[key] = row
+                self.__indexed = min(self.__indexed, row)
+                self.endMoveRows()
+                self.__update_row(row, item)
+            else:
+                self.__insert_row(row, item, key)
+
+    def insert_item(self, item: object) -> None:
+        "insert one item, in sort_key order when sort_key is set."
+        row = len(self.__items)
+        if self.__sort_key is not None:
+            row = bisect.bisect_right(
+                self.__items, self.__sort_key(item), key=self.__sort_key)
+        self.__insert_row(row, item, self.__key(item))
+
+    def update_item(self, item: object) -> None:
+        "repaint one item, moving it if its sort position changed."
+        row = self.find_row(item)
+        if row < 0:
+            return
+        if self.__sort_key is not None and not self.__in_order(row, item):
+            self.__remove_row(row)
+            self.insert_item(item)
+            return
+        self.__texts[row] = None
+        self.__update_row(row, item)
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def remove_item(self, item: object) -> None:
+        row = self.find_row(item)
+        if row >= 0:
+            self.__remove_row(row)
+
+    def find_row(self, item: object) -> int:
+        "return the row of item by key, -1 if it is not in the list."
+        return self.__row_of(self.__key(item))
+
+    def get_item(self, row: int) -> object:
+        return self.__items[row]
+
+    def clear(self) -> None:
+        self.set_items(list())
+
+    def __insert_row(self, row: int, item: object, key) -> None:
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.__items.insert(row, item)
+        self.__keys.insert(row, key)
+        self.__rows[key] = row
+        self.__indexed = min(self.__indexed, row)
+        self.__texts.insert(row, None)
+        self.endInsertRows()
+
+    def __remove_row(self, row: int) -> None:
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.__items[row]
+        del self.__rows[self.__keys.pop(row)]
+        self.__indexed = min(self.__indexed, row)
+        del self.__texts[row]
+        self.endRemoveRows()
+
+    def __fetched(self, generation: int, items: list) -> None:
+        if generation != self.__generation:
+            return
+        self.__fetching = False
+        if len(items) == 0:
+            self.__exhausted = True
+            return
+        self.append_items(items)
+
+    def __row_of(self, key) -> int:
+        "return the row of key, renumbering the rows after the first change when needed."
+        row = self.__rows.get(key)
+        if row is None:
+            return -1
+        if row >= self.__indexed:
+            for index in range(self.__indexed, len(self.__keys)):
+                self.__rows[self.__keys[index]] = index
+            self.__indexed = len(self.__keys)
+            row = self.__rows[key]
+        return row
+
+    def __in_order(self, row: int, item: object) -> bool:
+        "return True if item still sorts between its neighbours."
+        key = self.__sort_key(item)
+        if row > 0 and self.__sort_key(self.__items[row - 1]) > key:
+            return False
+        if row + 1 < len(self.__items) and key > self.__sort_key(self.__items[row + 1]):
+            return False
+        return True
+
+    def __update_row(self, row: int, item: object) -> None:
+        "swap in item and repaint the row only if its text changed."
+        self.__items[row] = item
+        text = self.__texts[row]
+        if text is None:
+            return
+        self.__texts[row] = self.__formatter(item)
+        if self.__texts[row] != text:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+
+class ListItemDelegate(QStyledItemDelegate):
+    """
+    paint one row of a list view.\n
+    columns are the text rects inside a row, line is the separator under it.
+    """
+
+    def __init__(
+            self,
+            size: QSize,
+            columns: list[QRect],
+            line: QRect,
+            line_color: QColor,
+            color: QColor = QColor("#4A321C"),
+            hover_color: QColor = None,
+            background: QColor = None,
+            font: QFont = Theme.DONGLE_REGULAR_65,
+            parent: QObject = None):
+        QStyledItemDelegate.__init__(self, parent)
+        self.__size = size
+        self.__columns = columns
+        self.__line = line
+        self.__line_color = line_color
+        self.__color = color
+        self.__hover_color = hover_color
+        self.__background = background
+        self.__font = font
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return self.__size
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        texts = index.data(Qt.DisplayRole)
+        rect = option.rect
+
+        painter.save()
+        if self.__background is not None:
+            painter.fillRect(rect, self.__background)
+
+        color = self.__color
+        if self.__hover_color is not None and option.state & QStyle.State_MouseOver:
+            color = self.__hover_color
+
+        painter.setFont(self.__font)
+        painter.setPen(color)
+        metrics = painter.fontMetrics()
+        for column, text in zip(self.__columns, texts):
+            column = column.translated(rect.topLeft())
+            text = metrics.elidedText(text, Qt.ElideRight, column.width())
+            painter.drawText(column, Qt.AlignLeft | Qt.AlignVCenter, text)
+
+        painter.fillRect(self.__line.translated(
+            rect.topLeft()), self.__line_color)
+        painter.restore()
+
+
+class ListView(QListView):
+    """list that only paints the visible rows, use instead of a scroll area of row widgets."""
+
+    def __init__(self, parent: QWidget, delegate: ListItemDelegate, model: ListModel):
+        QListView.__init__(self, parent)
+        self.setObjectName("default_listView")
+        self.setUniformItemSizes(True)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+
+        delegate.setParent(self)
+        model.setParent(self)
+        self.setItemDelegate(delegate)
+        self.setModel(model)
+
+    def set_items(self, items: list) -> None:
+        self.model().set_items(items)
+
+    def set_fetcher(self, fetcher) -> None:
+        self.model().set_fetcher(fetcher)
+
+    def reconcile_items(self, items: list) -> None:
+        self.model().reconcile(items)
+
+    def insert_item(self, item: object) -> None:
+        self.model().insert_item(item)
+
+    def update_item(self, item: object) -> None:
+        self.model().update_item(item)
+
+    def remove_item(self, item: object) -> None:
+        self.model().remove_item(item)
+
+    def clear(self) -> None:
+        self.model().clear()
+
+    def set_item_click_listener(self, function) -> None:
+        "function is called with the clicked item."
+        self.clicked.connect(
+            lambda index: function(index.data(Qt.UserRole)))
+
+
+def name_row(item) -> tuple:
+    "row format for product lists."
+    return (item.get_name(),)
+
+
+def product_key(item) -> tuple:
+    "drinks and bakeries have separate id sequences."
+    return type(item).__name__, item.get_id()
+
+
+def product_name(item) -> str:
+    return item.get_name()
+
+
+def record_row(record) -> tuple:
+    "row format for log and receipt lists."
+    return record.get_date(), record.get_time(), record.get_desc()[0:51]
+
+
+"""
+View Pool (order line and product detail views are rebound instead of rebuilt)
+"""
+
+
+class PooledView(QWidget):
+    """
+    view that a ViewPool hands out again after reset().\n
+    listeners are connected through listen() so reset() can drop them
+    before the view is bound to the next item.
+    """
+
+    def __init__(self, parent: QWidget = None):
+        QWidget.__init__(self, parent)
+        self.__connections = list()
+
+    def listen(self, signal, function) -> None:
+        self.__connections.append(signal.connect(function))
+
+    def reset(self) -> None:
+        "drop every listener, subclasses also clear what they display."
+        for connection in self.__connections:
+            QObject.disconnect(connection)
+        self.__connections.clear()
+
+
+class ViewPool:
+    """
+    keeps released views of one class and hands them out again.\n
+    released views are parked hidden under owner, so they are freed with it.
+    prebuild views are built while the event loop is idle.
+    """
+
+    def __init__(self, owner: QWidget, factory, capacity: int = 8, prebuild: int = 0):
+        self.__owner = owner
+        self.__factory = factory
+        self.__capacity = capacity
+        self.__views: list[PooledView] = list()
+
+        self.__prebuild = min(prebuild, capacity)
+        self.__idle_timer = QTimer(owner)
+        self.__idle_timer.setInterval(0)
+        self.__idle_timer.timeout.connect(self.__build_next)
+        if self.__prebuild > 0:
+            self.__idle_timer.start()
+
+    def acquire(self) -> PooledView:
+        "return a reset view, a new one only when the pool is empty."
+        if len(self.__views) > 0:
+            return self.__views.pop()
+        return self.__factory()
+
+    def release(self, view: PooledView) -> None:
+        "take view back, it must already be out of any layout or stacked widget."
+        view.reset()
+        if len(self.__views) >= self.__capacity:
+            view.deleteLater()
+            return
+        view.hide()
+        view.setParent(self.__owner)
+        self.__views.append(view)
+
+    def size(self) -> int:
+        return len(self.__views)
+
+    def __build_next(self) -> None:
+        if len(self.__views) < self.__prebuild:
+            view = self.__factory()
+            view.hide()
+            view.setParent(self.__owner)
+            self.__views.append(view)
+        if len(self.__views) >= self.__prebuild:
+            self.__idle_timer.stop()
+
+
 """
 Log In page
 """
@@ -18,7 +437,7 @@ class LoginView(QWidget):
         label_logo = QLabel(self)
         label_logo.setObjectName("default_label")
         label_logo.setGeometry(QRect(846, 158, 252, 252))
-        label_logo.setPixmap(QPixmap("src/asset/Image/logo.png"))
+        label_logo.setPixmap(Assets.svg("logo.svg"))
 
         label_username = QLabel("Username", self)
         label_username.setObjectName("default_label")
@@ -51,7 +470,6 @@ class LoginView(QWidget):
         self.login_button.setGeometry(QRect(860, 860, 200, 80))
 
         self.hide_error_label()
-        self.setStyleSheet(Theme.get_stylesheet())
 
     def reset(self) -> None:
         self.clear_info()
@@ -73,6 +491,9 @@ class LoginView(QWidget):
     def get_password(self) -> str:
         return self.lineEdit_password.text()
 
+    def set_loading(self, loading: bool) -> None:
+        self.login_button.setEnabled(not loading)
+
     def set_login_button_listener(self, function) -> None:
         self.login_button.clicked.connect(function)
 
@@ -126,8 +547,6 @@ class HomeView(QWidget):
         self.stacked_widget.setObjectName("stacked_widget")
         self.stacked_widget.setGeometry(QRect(0, -50, 1920, 1060))
 
-        self.setStyleSheet(Theme.get_stylesheet())
-
     def add_view(self, view: QWidget) -> None:
         self.stacked_widget.addWidget(view)
 
@@ -202,7 +621,7 @@ class OrderView(QWidget):
         total_label.setFont(Theme.DONGLE_BOLD_65)
         total_label.setGeometry(QRect(420, 660, 110, 40))
 
-        self.number_label = QLabel("0", order_frame)
+        self.number_label = QLabel("0.00", order_frame)
         self.number_label.setObjectName("default_label")
         self.number_label.setFont(Theme.DONGLE_BOLD_65)
         self.number_label.setAlignment(Qt.AlignCenter)
@@ -213,20 +632,38 @@ class OrderView(QWidget):
         self.order_button.setFont(Theme.DONGLE_BOLD_65)
         self.order_button.setGeometry(QRect(1145, 885, 700, 80))
 
+        self.error = QLabel("Could not save the order, try again", self)
+        self.error.setObjectName("default_label")
+        self.error.setFont(Theme.DONGLE_REGULAR_50)
+        self.error.setAlignment(Qt.AlignCenter)
+        self.error.setGeometry(QRect(1145, 835, 700, 50))
+        self.error.hide()
+
         self.stacked_widget = QStackedWidget(self)
         self.stacked_widget.setObjectName("stacked_widget")
         self.stacked_widget.setGeometry(QRect(75, 115, 1000, 850))
 
-        self.setStyleSheet(Theme.get_stylesheet())
-
     def set_order_button_listener(self, function) -> None:
         self.order_button.clicked.connect(function)
 
+    def set_loading(self, loading: bool) -> None:
+        self.order_button.setEnabled(not loading)
+        self.order_button.setText("Saving..." if loading else "Order")
+        if loading:
+            self.hide_error_label()
+
+    def show_error_label(self) -> None:
+        self.error.show()
+
+    def hide_error_label(self) -> None:
+        self.error.hide()
+
     def insert_view(self, view: QWidget, index: int = 0) -> None:
-        self.stacked_widget.insertWidget(0, view)
+        self.stacked_widget.insertWidget(index, view)
 
-    def set_total(self, total_price: float = 0) -> None:
-        self.number_label.setText(f"{total_price:.01f}")
+    def set_total(self, total_price: str = "0.00") -> None:
+        "show the total as formatted by the cart."
+        self.number_label.setText(total_price)
 
     def get_total(self) -> float:
         return float(self.number_label.text())
@@ -235,19 +672,21 @@ class OrderView(QWidget):
         self.stacked_widget.setCurrentIndex(index)
 
     def reset(self) -> None:
-        self.set_total(0)
+        self.set_total()
         self.clear_layout(self.vBox)
 
     def clear_layout(self, layout):
         for i in reversed(range(layout.count())):
-            layout.itemAt(i).widget().setParent(None)
+            widget = layout.itemAt(i).widget()
+            widget.setParent(None)
+            widget.deleteLater()
 
 # Order item (Sub view for order view)
 
 
-class OrderItemView(QWidget):
+class OrderItemView(PooledView):
     def __init__(self, parent: QWidget = None):
-        QWidget.__init__(self, parent)
+        PooledView.__init__(self, parent)
         self.setFixedSize(620, 85)
 
         self.name_label = QLabel("Menu Name", self)
@@ -272,33 +711,37 @@ class OrderItemView(QWidget):
         self.plus_button.setFont(Theme.DONGLE_REGULAR_65)
         self.plus_button.setGeometry(QRect(440, 15, 50, 50))
 
-        self.price_label = QLabel("0.0", self)
+        self.price_label = QLabel("0.00", self)
         self.price_label.setEnabled(False)
         self.price_label.setObjectName("default_label")
         self.price_label.setFont(Theme.DONGLE_REGULAR_65)
         self.price_label.setAlignment(Qt.AlignCenter)
         self.price_label.setGeometry(QRect(485, 25, 150, 40))
 
-        self.setStyleSheet(Theme.get_stylesheet())
-
     def set_item_name(self, item_name: str) -> None:
         self.name_label.setText(item_name)
 
     def set_quantity(self, count: int) -> None:
         self.quantity_label.setText(str(count))
 
-    def set_price_label(self, price: float) -> None:
-        self.price_label.setText(f"{price:.01f}")
+    def set_price_label(self, price: str) -> None:
+        self.price_label.setText(price)
 
     def increase_button_listener(self, function) -> None:
-        self.plus_button.clicked.connect(function)
+        self.listen(self.plus_button.clicked, function)
 
     def decrease_button_listener(self, function) -> None:
-        self.minus_button.clicked.connect(function)
+        self.listen(self.minus_button.clicked, function)
 
     def get_total_price(self) -> float:
         return float(self.price_label.text())
 
+    def reset(self) -> None:
+        PooledView.reset(self)
+        self.set_item_name("Menu Name")
+        self.set_quantity(1)
+        self.set_price_label("0.00")
+
 # Order List Panel (left side)
 
 
@@ -315,72 +758,47 @@ class OrderListView(QWidget):
         menu_label.setFont(Theme.DONGLE_BOLD_80)
         menu_label.setGeometry(QRect(54, 26, 128, 116))
 
-        # self.search_bar = QLineEdit(self)
-        # self.search_bar.setObjectName("search_bar")
-        # self.search_bar.setFont(Theme.DONGLE_REGULAR_65)
-        # self.search_bar.setGeometry(QRect(272, 40, 677, 80))
-
-        self.menu_scrollArea = QScrollArea(self)
-        self.menu_scrollArea.setObjectName("default_scrollArea")
-        self.menu_scrollArea.setGeometry(QRect(57, 169, 885, 630))
-        self.menu_scrollArea.setWidgetResizable(True)
-        self.menu_scrollArea.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.menu_scrollArea.setHorizontalScrollBarPolicy(
-            Qt.ScrollBarAlwaysOff)
-
-        self.menu_scrollAreaContents = QWidget(self.menu_scrollArea)
-        self.menu_scrollAreaContents.setObjectName(
-            "default_scrollAreaContents")
-        self.menu_scrollAreaContents.setGeometry(QRect(0, 0, 883, 628))
-
-        self.vBox = QVBoxLayout()
-        self.menu_scrollAreaContents.setLayout(self.vBox)
-        self.menu_scrollArea.setWidget(self.menu_scrollAreaContents)
-
-        self.setStyleSheet(Theme.get_stylesheet())
-
-    # def get_searched_item(self) -> str:
-    #     return self.search_bar.text()
+        self.search_bar = QLineEdit(self)
+        self.search_bar.setObjectName("search_bar")
+        self.search_bar.setFont(Theme.DONGLE_REGULAR_65)
+        self.search_bar.setGeometry(QRect(272, 40, 677, 80))
+        self.search_bar.setClearButtonEnabled(True)
 
-    def add_widget_to_scrollarea(self, widget: QWidget) -> None:
-        self.vBox.addWidget(widget)
+        # rows (previously OrderListItemView) are painted by the delegate
+        self.menu_list = ListView(self, ListItemDelegate(
+            QSize(860, 86),
+            [QRect(60, 10, 780, 50)],
+            QRect(40, 70, 820, 3),
+            QColor(249, 245, 240, 128),
+            hover_color=QColor("#F9F5F0")),
+            ListModel(name_row, product_key, product_name))
+        self.menu_list.setGeometry(QRect(57, 169, 885, 630))
 
-    def clear__scrollarea(self):
-        for i in reversed(range(self.vBox.count())):
-            self.vBox.itemAt(i).widget().setParent(None)
+    def get_searched_item(self) -> str:
+        return self.search_bar.text()
 
-# Order Item (Sub view for order list view)
+    def set_search_listener(self, function) -> None:
+        "function(text) is called on every edit of the search bar."
+        self.search_bar.textChanged.connect(function)
 
+    def set_items(self, items: list) -> None:
+        self.menu_list.set_items(items)
 
-class OrderListItemView(QWidget):
-    def __init__(self, parent: QWidget = None):
-        QWidget.__init__(self, parent)
-        self.setFixedSize(800, 80)
-        self.setObjectName("brown_item")
+    def reconcile_items(self, items: list) -> None:
+        self.menu_list.reconcile_items(items)
 
-        self.name_button = QPushButton("Menu Name", self)
-        self.name_button.setObjectName("brown_list_button")
-        self.name_button.setFont(Theme.DONGLE_REGULAR_65)
-        self.name_button.setGeometry(QRect(50, 10, 780, 50))
+    def clear_list(self) -> None:
+        self.menu_list.clear()
 
-        white_line = QFrame(self)
-        white_line.setObjectName("white_line")
-        white_line.setGeometry(QRect(30, 70, 820, 3))
-
-        self.setStyleSheet(Theme.get_stylesheet())
-
-    def set_itemname(self, item_name: str) -> None:
-        self.name_button.setText(item_name)
-
-    def set_button_listener(self, function) -> None:
-        self.name_button.clicked.connect(function)
+    def set_item_click_listener(self, function) -> None:
+        self.menu_list.set_item_click_listener(function)
 
 # Drink Menu Details
 
 
-class DrinkDetailView(QWidget):
+class DrinkDetailView(PooledView):
     def __init__(self, parent: QWidget = None):
-        QWidget.__init__(self, parent)
+        PooledView.__init__(self, parent)
 
         order_frame = QFrame(self)
         order_frame.setObjectName("brown_border_frame")
@@ -461,8 +879,6 @@ class DrinkDetailView(QWidget):
         self.add_button.setFont(Theme.DONGLE_REGULAR_65)
         self.add_button.setGeometry(QRect(558, 739, 200, 80))
 
-        self.setStyleSheet(Theme.get_stylesheet())
-
     def set_name(self, name: str) -> None:
         self.menu_name.setText(name)
 
@@ -484,18 +900,32 @@ class DrinkDetailView(QWidget):
     def get_detail(self) -> str:
         return f"{self.menu_name.text()[0:6]} {self.get_drink_type()[0].upper()}{int(self.get_sweetness()):02d}"
 
+    def get_variant(self) -> str:
+        return f"{self.get_drink_type()} {self.get_sweetness()}"
+
     def set_cancel_button_listener(self, function) -> None:
-        self.cancel_button.clicked.connect(function)
+        self.listen(self.cancel_button.clicked, function)
 
     def set_add_button_listener(self, function) -> None:
-        self.add_button.clicked.connect(function)
+        self.listen(self.add_button.clicked, function)
+
+    def reset(self) -> None:
+        PooledView.reset(self)
+        self.set_name("")
+        for group in [self.drinkType_buttonGroup, self.sweetness_buttonGroup]:
+            # an exclusive group refuses to uncheck its checked button
+            group.setExclusive(False)
+            for button in group.buttons():
+                button.setChecked(False)
+                button.setEnabled(True)
+            group.setExclusive(True)
 
 # Bakery Menu Details
 
 
-class BakeryDetailView(QWidget):
+class BakeryDetailView(PooledView):
     def __init__(self, parent: QWidget = None):
-        QWidget.__init__(self, parent)
+        PooledView.__init__(self, parent)
 
         order_frame = QFrame(self)
         order_frame.setObjectName("brown_border_frame")
@@ -516,16 +946,18 @@ class BakeryDetailView(QWidget):
         self.add_button.setFont(Theme.DONGLE_REGULAR_65)
         self.add_button.setGeometry(QRect(558, 739, 200, 80))
 
-        self.setStyleSheet(Theme.get_stylesheet())
-
     def set_name(self, name: str) -> None:
         self.menu_name.setText(name)
 
     def set_cancel_button_listener(self, function) -> None:
-        self.cancel_button.clicked.connect(function)
+        self.listen(self.cancel_button.clicked, function)
 
     def set_add_button_listener(self, function) -> None:
-        self.add_button.clicked.connect(function)
+        self.listen(self.add_button.clicked, function)
+
+    def reset(self) -> None:
+        PooledView.reset(self)
+        self.set_name("")
 
 
 """
@@ -561,33 +993,27 @@ class ReceiptView(QWidget):
         brown_line.setObjectName("dark_brown_line")
         brown_line.setGeometry(QRect(40, 103, 1722, 3))
 
-        self.receipt_scrollArea = QScrollArea(receipt_frame)
-        self.receipt_scrollArea.setObjectName("default_scrollArea")
-        self.receipt_scrollArea.setGeometry(QRect(45, 129, 1712, 750))
-        self.receipt_scrollArea.setWidgetResizable(True)
-        self.receipt_scrollArea.setVerticalScrollBarPolicy(
-            Qt.ScrollBarAlwaysOff)
-        self.receipt_scrollArea.setHorizontalScrollBarPolicy(
-            Qt.ScrollBarAlwaysOff)
+        self.receipt_list = ListView(
+            receipt_frame, RecordItemDelegate(), ListModel(record_row))
+        self.receipt_list.setGeometry(QRect(45, 129, 1712, 750))
 
-        self.receipt_scrollAreaContents = QWidget(self.receipt_scrollArea)
-        self.receipt_scrollAreaContents.setObjectName(
-            "default_scrollAreaContents")
-        self.receipt_scrollAreaContents.setGeometry(QRect(0, 0, 1710, 748))
+        self.loading_label = QLabel("Loading...", receipt_frame)
+        self.loading_label.setObjectName("white_label")
+        self.loading_label.setGeometry(QRect(1500, 31, 250, 61))
+        self.loading_label.setFont(Theme.DONGLE_BOLD_70)
+        self.loading_label.hide()
 
-        self.vBox = QVBoxLayout()
-        self.vBox.setAlignment(Qt.AlignTop)
-        self.receipt_scrollAreaContents.setLayout(self.vBox)
-        self.receipt_scrollArea.setWidget(self.receipt_scrollAreaContents)
+    def set_items(self, receipts: list) -> None:
+        self.receipt_list.set_items(receipts)
 
-        self.setStyleSheet(Theme.get_stylesheet())
+    def set_fetcher(self, fetcher) -> None:
+        self.receipt_list.set_fetcher(fetcher)
 
-    def add_receipt_to_scrollarea(self, widget: QWidget) -> None:
-        self.vBox.addWidget(widget)
+    def clear_list(self) -> None:
+        self.receipt_list.clear()
 
-    def clear__scrollarea(self):
-        for i in reversed(range(self.vBox.count())):
-            self.vBox.itemAt(i).widget().setParent(None)
+    def set_loading(self, loading: bool) -> None:
+        self.loading_label.setVisible(loading)
 
 
 """
@@ -623,61 +1049,43 @@ class LogView(QWidget):
         brown_line.setObjectName("dark_brown_line")
         brown_line.setGeometry(QRect(40, 103, 1722, 3))
 
-        self.log_scrollArea = QScrollArea(log_frame)
-        self.log_scrollArea.setObjectName("default_scrollArea")
-        self.log_scrollArea.setGeometry(QRect(45, 129, 1712, 750))
-        self.log_scrollArea.setWidgetResizable(True)
-        self.log_scrollArea.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        # self.log_scrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.log_list = ListView(
+            log_frame, RecordItemDelegate(), ListModel(record_row))
+        self.log_list.setGeometry(QRect(45, 129, 1712, 750))
 
-        self.log_scrollAreaContents = QWidget(self.log_scrollArea)
-        self.log_scrollAreaContents.setObjectName("default_scrollAreaContents")
-        self.log_scrollAreaContents.setGeometry(QRect(0, 0, 1710, 748))
+        self.loading_label = QLabel("Loading...", log_frame)
+        self.loading_label.setObjectName("white_label")
+        self.loading_label.setGeometry(QRect(1500, 31, 250, 61))
+        self.loading_label.setFont(Theme.DONGLE_BOLD_70)
+        self.loading_label.hide()
 
-        self.vBox = QVBoxLayout()
-        self.vBox.setAlignment(Qt.AlignTop)
-        self.log_scrollAreaContents.setLayout(self.vBox)
-        self.log_scrollArea.setWidget(self.log_scrollAreaContents)
+    def set_items(self, logs: list) -> None:
+        self.log_list.set_items(logs)
 
-        self.setStyleSheet(Theme.get_stylesheet())
+    def set_fetcher(self, fetcher) -> None:
+        self.log_list.set_fetcher(fetcher)
 
-    def add_log_to_scrollarea(self, widget: QWidget) -> None:
-        self.vBox.addWidget(widget)
+    def clear_list(self) -> None:
+        self.log_list.clear()
 
-    def clear__scrollarea(self):
-        for i in reversed(range(self.vBox.count())):
-            self.vBox.itemAt(i).widget().setParent(None)
+    def set_loading(self, loading: bool) -> None:
+        self.loading_label.setVisible(loading)
 
 
 # Log Item (Sub view for log view and receipt view)
 
 
-class LogItem(QWidget):
-    def __init__(self, date: str = None, time: str = None, desc: str = None):
-        QWidget.__init__(self, None)
-        self.setFixedSize(1680, 80)
-        self.setObjectName("brown_item")
-
-        self.date = QLabel(date, self)
-        self.date.setObjectName("default_label")
-        self.date.setFont(Theme.DONGLE_REGULAR_65)
-        self.date.setGeometry(QRect(0, 10, 211, 41))
-
-        self.time = QLabel(time, self)
-        self.time.setObjectName("default_label")
-        self.time.setFont(Theme.DONGLE_REGULAR_65)
-        self.time.setGeometry(QRect(385, 10, 111, 41))
-
-        self.name_act = QLabel(desc, self)
-        self.name_act.setObjectName("default_label")
-        self.name_act.setFont(Theme.DONGLE_REGULAR_65)
-        self.name_act.setGeometry(QRect(630, 10, 1020, 41))
-
-        line = QFrame(self)
-        line.setObjectName("white_line")
-        line.setGeometry(QRect(0, 70, 1670, 3))
+class RecordItemDelegate(ListItemDelegate):
+    "row of date, time and description (previously LogItem)."
 
-        self.setStyleSheet(Theme.get_stylesheet())
+    def __init__(self, parent: QObject = None):
+        super().__init__(
+            QSize(1680, 86),
+            [QRect(11, 10, 211, 41), QRect(396, 10, 111, 41),
+             QRect(641, 10, 1020, 41)],
+            QRect(11, 70, 1670, 3),
+            QColor(249, 245, 240, 128),
+            parent=parent)
 
 
 """
@@ -697,9 +1105,7 @@ class AdminEmptyView(QWidget):
         label_logo = QLabel(admin_frame)
         label_logo.setObjectName("default_label")
         label_logo.setGeometry(QRect(260, 276, 253, 253))
-        label_logo.setPixmap(QPixmap("src/asset/Image/logo.png"))
-
-        self.setStyleSheet(Theme.get_stylesheet())
+        label_logo.setPixmap(Assets.svg("logo.svg"))
 
 
 """
@@ -720,27 +1126,32 @@ class MenuView(QWidget):
         menu_label.setFont(Theme.DONGLE_BOLD_80)
         menu_label.setGeometry(QRect(55, 70, 130, 51))
 
-        # self.search_bar = QLineEdit(admin_frame)
-        # self.search_bar.setObjectName("search_bar")
-        # self.search_bar.setFont(Theme.DONGLE_REGULAR_65)
-        # self.search_bar.setGeometry(QRect(260, 53, 680, 80))
-
-        self.admin_scrollArea = QScrollArea(admin_frame)
-        self.admin_scrollArea.setObjectName("default_scrollArea")
-        self.admin_scrollArea.setGeometry(QRect(55, 182, 890, 480))
-        self.admin_scrollArea.setWidgetResizable(True)
-        self.admin_scrollArea.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.admin_scrollArea.setHorizontalScrollBarPolicy(
-            Qt.ScrollBarAlwaysOff)
-
-        self.admin_scrollAreaContents = QWidget(self.admin_scrollArea)
-        self.admin_scrollAreaContents.setObjectName(
-            "default_scrollAreaContents")
-        self.admin_scrollAreaContents.setGeometry(QRect(0, 0, 888, 478))
-
-        self.vBox = QVBoxLayout()
-        self.admin_scrollAreaContents.setLayout(self.vBox)
-        self.admin_scrollArea.setWidget(self.admin_scrollAreaContents)
+        self.search_bar = QLineEdit(admin_frame)
+        self.search_bar.setObjectName("search_bar")
+        self.search_bar.setFont(Theme.DONGLE_REGULAR_65)
+        self.search_bar.setGeometry(QRect(260, 53, 680, 80))
+        self.search_bar.setClearButtonEnabled(True)
+
+        # rows (previously AdminListItem) are painted by the delegate
+        self.admin_list = ListView(admin_frame, ListItemDelegate(
+            QSize(860, 86),
+            [QRect(60, 10, 780, 50)],
+            QRect(40, 70, 820, 3),
+            QColor("#D8B797"),
+            hover_color=QColor("#D8B797")),
+            ListModel(name_row, product_key, product_name))
+        self.admin_list.setGeometry(QRect(55, 182, 890, 480))
+
+        self.import_label = QLabel(admin_frame)
+        self.import_label.setObjectName("default_label")
+        self.import_label.setFont(Theme.DONGLE_REGULAR_50)
+        self.import_label.setGeometry(QRect(55, 705, 560, 100))
+        self.import_label.setWordWrap(True)
+
+        self.import_button = QPushButton("Import", self)
+        self.import_button.setObjectName("default_button")
+        self.import_button.setFont(Theme.DONGLE_REGULAR_65)
+        self.import_button.setGeometry(QRect(695, 820, 200, 100))
 
         self.add_button = QPushButton("+", self)
         self.add_button.setObjectName("default_button")
@@ -752,24 +1163,53 @@ class MenuView(QWidget):
         self.stacked_widget.setGeometry(QRect(1130, 115, 720, 850))
         # self.stacked_widget.setStyleSheet("background: black")
 
-        self.setStyleSheet(Theme.get_stylesheet())
+    def get_searched_item(self) -> str:
+        return self.search_bar.text()
 
-    # def get_searched_item(self) -> str:
-    #     return self.search_bar.text()
+    def set_search_listener(self, function) -> None:
+        "function(text) is called on every edit of the search bar."
+        self.search_bar.textChanged.connect(function)
+
+    def set_items(self, items: list) -> None:
+        self.admin_list.set_items(items)
+
+    def reconcile_items(self, items: list) -> None:
+        self.admin_list.reconcile_items(items)
+
+    def insert_item(self, item: object) -> None:
+        self.admin_list.insert_item(item)
+
+    def update_item(self, item: object) -> None:
+        self.admin_list.update_item(item)
+
+    def remove_item(self, item: object) -> None:
+        self.admin_list.remove_item(item)
 
-    def add_view_to_scrollarea(self, view: QWidget) -> None:
-        self.vBox.addWidget(view)
+    def clear_list(self) -> None:
+        self.admin_list.clear()
+
+    def set_item_click_listener(self, function) -> None:
+        self.admin_list.set_item_click_listener(function)
 
     def add_view_to_stackedwidget(self, view: QWidget) -> None:
         self.stacked_widget.insertWidget(0, view)
 
-    def clear__scrollarea(self):
-        for i in reversed(range(self.vBox.count())):
-            self.vBox.itemAt(i).widget().setParent(None)
-
     def set_add_button_listener(self, function) -> None:
         self.add_button.clicked.connect(function)
 
+    def set_import_button_listener(self, function) -> None:
+        self.import_button.clicked.connect(function)
+
+    def ask_import_file(self) -> str:
+        "return the CSV file picked to import, empty when cancelled."
+        return QFileDialog.getOpenFileName(self, "Import menu", "", "CSV files (*.csv)")[0]
+
+    def set_import_message(self, text: str) -> None:
+        self.import_label.setText(text)
+
+    def set_import_enabled(self, enabled: bool) -> None:
+        self.import_button.setEnabled(enabled)
+
 # Create new menu (Sub view for menu view)
 
 
@@ -869,11 +1309,15 @@ class MenuCreateView(QWidget):
         self.add_button.setFont(Theme.DONGLE_REGULAR_65)
         self.add_button.setGeometry(QRect(394, 730, 200, 80))
 
+        self.error = QLabel("This name is already taken", menu_frame)
+        self.error.setObjectName("default_label")
+        self.error.setFont(Theme.DONGLE_REGULAR_50)
+        self.error.setGeometry(QRect(33, 640, 650, 50))
+        self.error.hide()
+
         self.drink_button.setChecked(True)
         self.show_drink_info()
 
-        self.setStyleSheet(Theme.get_stylesheet())
-
         self.drink_button.setChecked(True)
         self.show_drink_info()
         self.drink_button.clicked.connect(self.show_drink_info)
@@ -946,6 +1390,12 @@ class MenuCreateView(QWidget):
             return 0.0
         return float(self.bakery_price.text())
 
+    def show_error_label(self) -> None:
+        self.error.show()
+
+    def hide_error_label(self) -> None:
+        self.error.hide()
+
 
 # Edit menu (Sub view for menu view)
 
@@ -1052,7 +1502,11 @@ class MenuEditView(QWidget):
         self.delete_button.setFont(Theme.DONGLE_REGULAR_65)
         self.delete_button.setGeometry(QRect(480, 730, 200, 80))
 
-        self.setStyleSheet(Theme.get_stylesheet())
+        self.error = QLabel("This name is already taken", menu_frame)
+        self.error.setObjectName("default_label")
+        self.error.setFont(Theme.DONGLE_REGULAR_50)
+        self.error.setGeometry(QRect(33, 640, 650, 50))
+        self.error.hide()
 
         self.drink_button.clicked.connect(self.show_drink_info)
         self.bakery_button.clicked.connect(self.show_bakery_info)
@@ -1063,6 +1517,12 @@ class MenuEditView(QWidget):
     def set_name(self, name: str) -> None:
         self.name_bar.setText(name)
 
+    def show_error_label(self) -> None:
+        self.error.show()
+
+    def hide_error_label(self) -> None:
+        self.error.hide()
+
     def show_drink_info(self) -> None:
         self.hot_checkBox.show()
         self.cold_checkBox.show()
@@ -1146,31 +1606,6 @@ class MenuEditView(QWidget):
             return 0.0
         return float(self.bakery_price.text())
 
-# List item (Sub view for menu view and account view)
-
-
-class AdminListItem(QWidget):
-    def __init__(self, parent: QWidget = None):
-        QWidget.__init__(self, parent)
-        self.setFixedSize(860, 80)
-
-        self.name_button = QPushButton("List Name", self)
-        self.name_button.setObjectName("white_list_button")
-        self.name_button.setFont(Theme.DONGLE_REGULAR_65)
-        self.name_button.setGeometry(QRect(50, 10, 780, 50))
-
-        brown_line = QFrame(self)
-        brown_line.setObjectName("brown_line")
-        brown_line.setGeometry(QRect(30, 70, 820, 3))
-
-        self.setStyleSheet(Theme.get_stylesheet())
-
-    def set_itemname(self, item_name: str) -> None:
-        self.name_button.setText(item_name)
-
-    def set_button_listener(self, function) -> None:
-        self.name_button.clicked.connect(function)
-
 
 """
 Account management for admin
@@ -1222,8 +1657,6 @@ class AccountView(QWidget):
         self.stacked_widget.setGeometry(QRect(1130, 115, 720, 850))
         # self.stacked_widget.setStyleSheet("background: black")
 
-        self.setStyleSheet(Theme.get_stylesheet())
-
     # def get_searched_item(self) -> str:
     #     return self.search_bar.text()
 
@@ -1309,8 +1742,6 @@ class AccountCreateView(QWidget):
         self.add_button.setFont(Theme.DONGLE_REGULAR_65)
         self.add_button.setGeometry(QRect(394, 730, 200, 80))
 
-        self.setStyleSheet(Theme.get_stylesheet())
-
     def set_fname(self, fname: str = None) -> None:
         if fname is None:
             return
@@ -1451,6 +1882,4 @@ class AccountEditView(QWidget):
         self.delete_button.setObjectName("default_button")
         self.delete_button.setFont(Theme.DONGLE_REGULAR_65)
         self.delete_button.setGeometry(QRect(480, 730, 200, 80))
-
-        self.setStyleSheet(Theme.get_stylesheet())
 """